@@ -2,29 +2,12 @@
 import os
 import sys
 import logging
+import multiprocessing
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 
-try:
-    from modules import filename_manager
-    from modules import text_converter
-    from modules import pdf_security_processor
-    from modules import pdf_processor
-    from modules import iso_creator
-    from modules import image_converter
-    from modules import file_combiner 
-    from modules import file_organizer 
-    from modules import folder_processor
-except ImportError:
-    from modules import filename_manager
-    from modules import text_converter
-    from modules import pdf_security_processor
-    from modules import pdf_processor
-    from modules import iso_creator
-    from modules import image_converter
-    from modules import file_combiner
-    from modules import file_organizer
-    from modules import folder_processor
+# The tool modules pull in PyMuPDF, pikepdf, Pillow, pypinyin, ebooklib, ... Each route imports its module
+# on first use instead, so the server (and /api/health) comes up without loading every library.
 
 app = Flask(__name__)
 CORS(app)
@@ -33,6 +16,19 @@ logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 module_logger = logging.getLogger(__name__)
 
+_TRUE_STRINGS = {"true", "1", "yes", "on"}
+_FALSE_STRINGS = {"false", "0", "no", "off", ""}
+
+def _json_flag(data, key, default=False):
+    """Read an optional boolean field; strings like "false" are parsed, not truth-tested. None if invalid."""
+    value = data.get(key, default)
+    if isinstance(value, bool): return value
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in _TRUE_STRINGS: return True
+        if lowered in _FALSE_STRINGS: return False
+    return None
+
 # Health check endpoint for monitoring
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -51,6 +47,7 @@ def api_add_filename_prefix():
         processed_files_list = data.get('processed_files_list', None)
         if not directory_path or prefix is None: return jsonify({"status": "error", "message": "Missing 'directory_path' or 'prefix'."}), 400
         if not os.path.isdir(directory_path): return jsonify({"status": "error", "message": f"Directory not found: {directory_path}"}), 404
+        from modules import filename_manager
         result = filename_manager.add_filename_prefix_api(directory_path, prefix, processed_files_list)
         status_code = 200 if result.get("success") else 500
         return jsonify({"status": "success" if result.get("success") else "error", "message": "Prefix addition process finished.", "details": result}), status_code
@@ -68,6 +65,7 @@ def api_delete_filename_chars():
         char_pattern = data.get('char_pattern')
         if not directory_path or char_pattern is None: return jsonify({"status": "error", "message": "Missing 'directory_path' or 'char_pattern'."}), 400
         if not os.path.isdir(directory_path): return jsonify({"status": "error", "message": f"Directory not found: {directory_path}"}), 404
+        from modules import filename_manager
         result = filename_manager.delete_filename_chars_api(directory_path, char_pattern)
         status_code = 200 if result.get("success") else 500
         return jsonify({"status": "success" if result.get("success") else "error", "message": "Character deletion process finished.", "details": result}), status_code
@@ -86,6 +84,7 @@ def api_rename_items():
         if not directory_path or not mode: return jsonify({"status": "error", "message": "Missing 'directory_path' or 'mode'."}), 400
         if mode not in ['both', 'folders', 'files']: return jsonify({"status": "error", "message": "Invalid mode."}), 400
         if not os.path.isdir(directory_path): return jsonify({"status": "error", "message": f"Directory not found: {directory_path}"}), 404
+        from modules import filename_manager
         result = filename_manager.rename_items_api(directory_path, mode)
         status_code = 200 if result.get("success") else 500
         return jsonify({"status": "success" if result.get("success") else "error", "message": "Item renaming process finished.", "details": result}), status_code
@@ -102,6 +101,7 @@ def api_flatten_directories():
         directory_path = data.get('directory_path')
         if not directory_path: return jsonify({"status": "error", "message": "Missing 'directory_path'."}), 400
         if not os.path.isdir(directory_path): return jsonify({"status": "error", "message": f"Directory not found: {directory_path}"}), 404
+        from modules import filename_manager
         result = filename_manager.flatten_directories_api(directory_path)
         status_code = 200 if result.get("success") else 500
         return jsonify({"status": "success" if result.get("success") else "error", "message": "Directory flattening process finished.", "details": result}), status_code
@@ -118,6 +118,7 @@ def api_extract_numbers_in_filenames():
         directory_path = data.get('directory_path')
         if not directory_path: return jsonify({"status": "error", "message": "Missing 'directory_path'."}), 400
         if not os.path.isdir(directory_path): return jsonify({"status": "error", "message": f"Directory not found: {directory_path}"}), 404
+        from modules import filename_manager
         result = filename_manager.extract_numbers_in_filenames_api(directory_path)
         status_code = 200 if result.get("success") else 500
         return jsonify({"status": "success" if result.get("success") else "error", "message": "Number extraction process finished.", "details": result}), status_code
@@ -134,6 +135,7 @@ def api_reverse_rename():
         directory_path = data.get('directory_path')
         if not directory_path: return jsonify({"status": "error", "message": "Missing 'directory_path'."}), 400
         if not os.path.isdir(directory_path): return jsonify({"status": "error", "message": f"Directory not found: {directory_path}"}), 404
+        from modules import filename_manager
         result = filename_manager.reverse_rename_api(directory_path)
         status_code = 200 if result.get("success") else 500
         return jsonify({"status": "success" if result.get("success") else "error", "message": "Reverse renaming process finished.", "details": result}), status_code
@@ -152,6 +154,7 @@ def api_add_filename_suffix():
         processed_files_list = data.get('processed_files_list', None)
         if not directory_path or suffix is None: return jsonify({"status": "error", "message": "Missing 'directory_path' or 'suffix'."}), 400
         if not os.path.isdir(directory_path): return jsonify({"status": "error", "message": f"Directory not found: {directory_path}"}), 404
+        from modules import filename_manager
         result = filename_manager.add_filename_suffix_api(directory_path, suffix, processed_files_list)
         status_code = 200 if result.get("success") else 500
         return jsonify({"status": "success" if result.get("success") else "error", "message": "Suffix addition process finished.", "details": result}), status_code
@@ -170,7 +173,10 @@ def api_epub_to_txt():
         output_dir = data.get('output_dir') 
         if not input_dir or not output_dir: return jsonify({"status": "error", "message": "Missing 'input_dir' or 'output_dir'."}), 400
         if not os.path.isdir(input_dir): return jsonify({"status": "error", "message": f"Input directory not found: {input_dir}"}), 404
-        result = text_converter.epub_to_txt_api(input_dir, output_dir)
+        verbose = _json_flag(data, 'verbose')
+        if verbose is None: return jsonify({"status": "error", "message": "'verbose' must be a boolean."}), 400
+        from modules import text_converter
+        result = text_converter.epub_to_txt_api(input_dir, output_dir, verbose=verbose)
         status_code = 200 if result.get("success") else 500
         return jsonify({"status": "success" if result.get("success") else "error", "message": "EPUB to TXT conversion process finished.", "details": result}), status_code
     except Exception as e:
@@ -189,7 +195,10 @@ def api_pdf_to_txt():
         if not input_dir or not output_dir: return jsonify({"status": "error", "message": "Missing 'input_dir' or 'output_dir'."}), 400
         if output_format not in ['standard', 'compact', 'clean']: return jsonify({"status": "error", "message": "Invalid 'output_format'."}), 400
         if not os.path.isdir(input_dir): return jsonify({"status": "error", "message": f"Input directory not found: {input_dir}"}), 404
-        result = text_converter.pdf_to_txt_api(input_dir, output_dir, output_format)
+        verbose = _json_flag(data, 'verbose')
+        if verbose is None: return jsonify({"status": "error", "message": "'verbose' must be a boolean."}), 400
+        from modules import text_converter
+        result = text_converter.pdf_to_txt_api(input_dir, output_dir, output_format, verbose=verbose)
         status_code = 200 if result.get("success") else 500
         return jsonify({"status": "success" if result.get("success") else "error", "message": "PDF to TXT conversion process finished.", "details": result}), status_code
     except Exception as e:
@@ -208,7 +217,10 @@ def api_encode_pdfs():
         password = data.get('password')
         if not all([input_dir, output_dir, password]): return jsonify({"status": "error", "message": "Missing 'input_dir', 'output_dir', or 'password'."}), 400
         if not os.path.isdir(input_dir): return jsonify({"status": "error", "message": f"Input directory not found: {input_dir}"}), 404
-        result = pdf_security_processor.encode_pdfs_api(input_dir, output_dir, password)
+        verbose = _json_flag(data, 'verbose')
+        if verbose is None: return jsonify({"status": "error", "message": "'verbose' must be a boolean."}), 400
+        from modules import pdf_security_processor
+        result = pdf_security_processor.encode_pdfs_api(input_dir, output_dir, password, verbose=verbose)
         status_code = 200 if result.get("success") else 500
         return jsonify({"status": "success" if result.get("success") else "error", "message": "PDF encryption process finished.", "details": result}), status_code
     except Exception as e:
@@ -225,7 +237,10 @@ def api_decode_pdfs():
         password = data.get('password')
         if not input_dir or not password: return jsonify({"status": "error", "message": "Missing 'input_dir' or 'password'."}), 400
         if not os.path.isdir(input_dir): return jsonify({"status": "error", "message": f"Input directory not found: {input_dir}"}), 404
-        result = pdf_security_processor.decode_pdfs_api(input_dir, password)
+        verbose = _json_flag(data, 'verbose')
+        if verbose is None: return jsonify({"status": "error", "message": "'verbose' must be a boolean."}), 400
+        from modules import pdf_security_processor
+        result = pdf_security_processor.decode_pdfs_api(input_dir, password, verbose=verbose)
         status_code = 200 if result.get("success") else 500                                                       
         return jsonify({"status": "success" if result.get("success") else "error", "message": "PDF decryption process finished.", "details": result}), status_code
     except Exception as e:
@@ -250,7 +265,12 @@ def api_trim_pdf_pages():
         except ValueError: return jsonify({"status": "error", "message": "Invalid 'num_pages'. Must be a non-negative integer."}), 400
         if trim_type not in ['f', 'l', 'lf']: return jsonify({"status": "error", "message": "Invalid 'trim_type'. Must be 'f', 'l', or 'lf'."}), 400
         if not os.path.isdir(input_dir): return jsonify({"status": "error", "message": f"Input directory not found: {input_dir}"}), 404
-        result = pdf_processor.remove_pdf_pages_api(input_dir, output_dir, trim_type, num_pages)
+        linearize = _json_flag(data, 'linearize')
+        if linearize is None: return jsonify({"status": "error", "message": "'linearize' must be a boolean."}), 400
+        verbose = _json_flag(data, 'verbose')
+        if verbose is None: return jsonify({"status": "error", "message": "'verbose' must be a boolean."}), 400
+        from modules import pdf_processor
+        result = pdf_processor.remove_pdf_pages_api(input_dir, output_dir, trim_type, num_pages, linearize=linearize, verbose=verbose)
         status_code = 200 if result.get("success") else 500
         return jsonify({"status": "success" if result.get("success") else "error", "message": "PDF page trimming process finished.", "details": result}), status_code
     except Exception as e:
@@ -268,7 +288,10 @@ def api_remove_specific_pdf_pages():
         pages_to_delete_str = data.get('pages_to_delete_str') 
         if not all([input_dir, output_dir, pages_to_delete_str is not None]): return jsonify({"status": "error", "message": "Missing 'input_dir', 'output_dir', or 'pages_to_delete_str'."}), 400
         if not os.path.isdir(input_dir): return jsonify({"status": "error", "message": f"Input directory not found: {input_dir}"}), 404
-        result = pdf_processor.process_pdfs_for_specific_page_removal_api(input_dir, output_dir, pages_to_delete_str)
+        verbose = _json_flag(data, 'verbose')
+        if verbose is None: return jsonify({"status": "error", "message": "'verbose' must be a boolean."}), 400
+        from modules import pdf_processor
+        result = pdf_processor.process_pdfs_for_specific_page_removal_api(input_dir, output_dir, pages_to_delete_str, verbose=verbose)
         status_code = 200 if result.get("success") else 500
         return jsonify({"status": "success" if result.get("success") else "error", "message": "Specific PDF page removal process finished.", "details": result}), status_code
     except Exception as e:
@@ -285,7 +308,12 @@ def api_repair_pdfs():
         output_dir = data.get('output_dir')
         if not input_dir or not output_dir: return jsonify({"status": "error", "message": "Missing 'input_dir' or 'output_dir'."}), 400
         if not os.path.isdir(input_dir): return jsonify({"status": "error", "message": f"Input directory not found: {input_dir}"}), 404
-        result = pdf_processor.repair_pdfs_by_rebuilding_api(input_dir, output_dir)
+        linearize = _json_flag(data, 'linearize')
+        if linearize is None: return jsonify({"status": "error", "message": "'linearize' must be a boolean."}), 400
+        verbose = _json_flag(data, 'verbose')
+        if verbose is None: return jsonify({"status": "error", "message": "'verbose' must be a boolean."}), 400
+        from modules import pdf_processor
+        result = pdf_processor.repair_pdfs_by_rebuilding_api(input_dir, output_dir, linearize=linearize, verbose=verbose)
         status_code = 200 if result.get("success") else 500
         return jsonify({"status": "success" if result.get("success") else "error", "message": "PDF repair process finished.", "details": result}), status_code
     except Exception as e:
@@ -301,8 +329,11 @@ def api_create_iso_from_subfolders():
         if not data: return jsonify({"status": "error", "message": "No JSON data received."}), 400
         parent_dirs_list = data.get('parent_dirs_list')
         output_base_dir = data.get('output_base_dir', None) 
+        verbose = _json_flag(data, 'verbose')
+        if verbose is None: return jsonify({"status": "error", "message": "'verbose' must be a boolean."}), 400
         if not parent_dirs_list or not isinstance(parent_dirs_list, list): return jsonify({"status": "error", "message": "Missing or invalid 'parent_dirs_list'."}), 400
-        result = iso_creator.process_subfolders_to_iso_api(parent_dirs_list, output_base_dir)
+        from modules import iso_creator
+        result = iso_creator.process_subfolders_to_iso_api(parent_dirs_list, output_base_dir, verbose=verbose)
         if result.get("platform_error"): return jsonify({"status": "error", "message": result.get("platform_error"), "details": result}), 405 
         status_code = 200 if result.get("success") else 500
         return jsonify({"status": "success" if result.get("success") else "error", "message": "ISO creation process finished.", "details": result}), status_code
@@ -323,13 +354,17 @@ def api_compress_images_to_pdf():
         target_width = data.get('target_width', 1500)
         quality = data.get('quality', 90)
         dpi = data.get('dpi', 300)
+        use_processes = _json_flag(data, 'use_processes')
+        if use_processes is None: return jsonify({"status": "error", "message": "'use_processes' must be a boolean."}), 400
         if not input_dir or not output_dir: return jsonify({"status": "error", "message": "Missing 'input_dir' or 'output_dir'."}), 400
         if not os.path.isdir(input_dir): return jsonify({"status": "error", "message": f"Input directory not found: {input_dir}"}), 404
         try:
             target_width = int(target_width); quality = int(quality); dpi = int(dpi)
             if not (target_width > 0 and 0 <= quality <= 100 and dpi > 0): raise ValueError("Invalid image parameters.")
         except ValueError: return jsonify({"status": "error", "message": "Invalid 'target_width', 'quality', or 'dpi' values."}), 400
-        result = image_converter.compress_images_api(input_dir, output_dir, output_pdf_filename, target_width, quality, dpi)
+        from modules import image_converter
+        result = image_converter.compress_images_api(input_dir, output_dir, output_pdf_filename, target_width, quality, dpi,
+                                                     use_processes=use_processes)
         status_code = 200 if result.get("success") else 500
         return jsonify({"status": "success" if result.get("success") else "error", "message": "Image compression to PDF process finished.", "details": result}), status_code
     except Exception as e:
@@ -353,6 +388,7 @@ def api_pdf_to_images():
             dpi = int(dpi); quality = int(quality)
             if fmt.lower() not in ['png', 'jpg']: raise ValueError("Invalid format")
         except ValueError: return jsonify({"status": "error", "message": "Invalid 'fmt', 'dpi', or 'quality' values."}), 400
+        from modules import image_converter
         result = image_converter.pdf_to_images_api(input_dir, output_dir, fmt, dpi, quality)
         status_code = 200 if result.get("success") else 500
         return jsonify({"status": "success" if result.get("success") else "error", "message": "PDF to images conversion process finished.", "details": result}), status_code
@@ -377,6 +413,7 @@ def api_images_to_pdf():
             target_width = int(target_width); dpi = int(dpi)
             if not (target_width > 0 and dpi > 0): raise ValueError("Invalid image parameters.")
         except ValueError: return jsonify({"status": "error", "message": "Invalid 'target_width' or 'dpi' values."}), 400
+        from modules import image_converter
         result = image_converter.images_to_pdf_api(input_dir, output_dir, output_pdf_filename, target_width, dpi)
         status_code = 200 if result.get("success") else 500
         return jsonify({"status": "success" if result.get("success") else "error", "message": "Images to PDF conversion process finished.", "details": result}), status_code
@@ -399,6 +436,7 @@ def api_combine_files():
             return jsonify({"status": "error", "message": "Missing one or more required fields: 'input_dir', 'output_dir', 'file_type_char', 'output_base_name'."}), 400
         if file_type_char not in ['p', 't']: return jsonify({"status": "error", "message": "Invalid 'file_type_char'."}), 400
         if not os.path.isdir(input_dir): return jsonify({"status": "error", "message": f"Input directory not found: {input_dir}"}), 404
+        from modules import file_combiner
         result = file_combiner.combine_files_api(input_dir, output_dir, file_type_char, output_base_name)
         status_code = 200 if result.get("success") else 500
         return jsonify({"status": "success" if result.get("success") else "error", "message": "File combination process finished.", "details": result}), status_code
@@ -417,6 +455,7 @@ def api_encode_folders_double_compression():
         password = data.get('password', '1111') 
         if not input_dir: return jsonify({"status": "error", "message": "Missing 'input_dir'."}), 400
         if not os.path.isdir(input_dir): return jsonify({"status": "error", "message": f"Input directory not found: {input_dir}"}), 404
+        from modules import folder_processor
         result = folder_processor.encode_folders_with_double_compression_api(input_dir, password)
         status_code = 200 if result.get("success") else 500
         return jsonify({"status": "success" if result.get("success") else "error", "message": "Folder encoding process finished.", "details": result}), status_code
@@ -436,6 +475,7 @@ def api_decode_folders_double_decompression():
         if not os.path.isdir(input_dir): return jsonify({"status": "error", "message": f"Input directory not found: {input_dir}"}), 404
         # The API-adapted function for decode now takes only input_dir and password,
         # as output is implicitly input_dir for the Python library version.
+        from modules import folder_processor
         result = folder_processor.decode_folders_with_double_decompression_api(input_dir, password)
         status_code = 200 if result.get("success") else 500
         return jsonify({"status": "success" if result.get("success") else "error", "message": "Folder decoding process finished.", "details": result}), status_code
@@ -462,6 +502,7 @@ def api_organize_files_by_group():
             return jsonify({"status": "error", "message": f"Input directory not found: {input_dir}"}), 404
 
         module_logger.info(f"Processing file organization in '{input_dir}' for extensions '{target_extensions_str}'")
+        from modules import file_organizer
         result = file_organizer.organize_files_by_group_api(input_dir, target_extensions_str)
         
         status_code = 200 if result.get("success") else 500
@@ -477,5 +518,8 @@ def api_organize_files_by_group():
 
 
 if __name__ == '__main__':
+    # The packaged backend is a PyInstaller binary; spawned pool workers re-run it, and this makes them act as
+    # workers instead of starting another server on port 5001
+    multiprocessing.freeze_support()
     module_logger.info("Starting Flask backend server...")
     app.run(host='0.0.0.0', port=5001, debug=False)
\ No newline at end of file
@@ -0,0 +1,48 @@
+# backend/modules/_parallel.py - Worker pool shared by the batch modules
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+module_logger = logging.getLogger(__name__)
+
+def init_worker_logging(level: int):
+    """ProcessPoolExecutor initializer: gives worker processes a log handler at the parent's level."""
+    if not logging.getLogger().handlers:
+        logging.basicConfig(level=level, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+def _failed_file_record(filename: str, msg: str) -> dict:
+    """Internal helper: The standard result record for a job whose worker raised instead of returning one."""
+    return {"file": filename, "ok": False, "messages": [f"[ERROR] {msg}"], "detail": None, "error": msg}
+
+def run_jobs(worker, jobs: list, max_workers: int, use_threads: bool = False, failure_record=None) -> list:
+    """
+    Runs worker(*args) for every args tuple in jobs and returns the result records in job order.
+    jobs items are (filename, *args) tuples, the filename being the worker's first argument.
+    max_workers is the caller's bound (its module default already applied); a single job (or max_workers=1)
+    runs inline without starting a pool. use_threads picks a thread pool instead of a process pool, which skips
+    process startup and pickling for workers that mostly run in C with the GIL released.
+    Workers report their own errors; one that raises anyway (or a crashed worker process) gets
+    failure_record(filename, msg), by default a {"file", "ok", "messages", "detail", "error"} record.
+    """
+    workers = min(max_workers, len(jobs))
+    if workers <= 1:
+        return [worker(*args) for args in jobs]
+
+    failure_record = failure_record or _failed_file_record
+    results = [None] * len(jobs) # Filled by job index as futures complete
+    if use_threads:
+        pool = ThreadPoolExecutor(max_workers=workers)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker_logging,
+                                   initargs=(logging.getLogger().getEffectiveLevel(),))
+    with pool as executor:
+        futures = {executor.submit(worker, *args): idx for idx, args in enumerate(jobs)}
+        for future in as_completed(futures):
+            idx = futures[future]
+            try:
+                results[idx] = future.result()
+            except Exception as e:
+                filename = jobs[idx][0]
+                msg = f"Worker failed for '{filename}': {type(e).__name__} - {str(e).splitlines()[0] if str(e) else ''}"
+                module_logger.error(msg)
+                results[idx] = failure_record(filename, msg)
+    return results
@@ -3,20 +3,36 @@ import os
 import re
 import logging
 import time
+import shutil
 from tqdm import tqdm
 import pikepdf # For PDF combining
 
 module_logger = logging.getLogger(__name__)
 
+# Bound split of the precompiled pattern: natural_sort_key runs once per filename per sort
+_NAT_SPLIT = re.compile(r'(\d+)').split
+
+# Read size when concatenating TXT files (in characters, since the copy goes through the text layer)
+_TXT_COPY_CHUNK_CHARS = 1024 * 1024
+
 def natural_sort_key(s: str) -> list:
     """
     Generates a natural sort key for intelligent sorting of filenames.
     """
     return [
         int(text) if text.isdigit() else text.lower()
-        for text in re.split(r'(\d+)', s)
+        for text in _NAT_SPLIT(s)
     ]
 
+def _close_pdfs(pdfs: list) -> None:
+    """Internal helper: Closes the given pikepdf documents, ignoring close errors."""
+    for pdf in pdfs:
+        try:
+            pdf.close()
+        except Exception:
+            pass
+
+
 def _combine_pdfs_for_api(input_dir: str, files_to_combine: list, output_path: str) -> tuple[list, list]:
     """
     Internal helper: Core logic for merging PDF files using pikepdf.
@@ -28,12 +44,16 @@ def _combine_pdfs_for_api(input_dir: str, files_to_combine: list, output_path: s
     
     # Create a new PDF object to which pages from other PDFs will be appended
     new_pdf = pikepdf.Pdf.new() 
+    # Sources stay open until the merged PDF is saved, so page content streams are
+    # copied straight from the source files at save time instead of being buffered up front.
+    open_sources = []
     
     for filename in tqdm(files_to_combine, desc="API Merging PDFs", unit="file", disable=True):
         file_path = os.path.join(input_dir, filename)
         try:
-            with pikepdf.open(file_path) as src_pdf:
-                new_pdf.pages.extend(src_pdf.pages)
+            src_pdf = pikepdf.open(file_path)
+            open_sources.append(src_pdf)
+            new_pdf.pages.extend(src_pdf.pages)
             succeeded_filenames.append(filename)
             module_logger.info(f"Successfully appended '{filename}' to merge list.")
         except Exception as e:
@@ -46,7 +66,7 @@ def _combine_pdfs_for_api(input_dir: str, files_to_combine: list, output_path: s
         # If succeeded_filenames is empty but failed_file_details is also empty, it means no files were processed (e.g. input list was empty)
         # which should be handled by the caller.
         module_logger.error("No PDF files were successfully processed for merging. Output PDF not saved.")
-        # new_pdf.close() # Not strictly necessary as it wasn't saved
+        _close_pdfs([new_pdf] + open_sources)
         return succeeded_filenames, failed_file_details
 
     if not new_pdf.pages: # If no pages were added (e.g., all source PDFs were empty or unreadable)
@@ -55,11 +75,12 @@ def _combine_pdfs_for_api(input_dir: str, files_to_combine: list, output_path: s
         # For now, let's save it if at least one file was "successfully" opened even if it had no pages.
         # If succeeded_filenames is empty, this block won't be reached if there were errors.
         if not succeeded_filenames: # No files were even attempted or all failed before page extend
+             _close_pdfs([new_pdf] + open_sources)
              return succeeded_filenames, failed_file_details
 
 
     try:
-        new_pdf.save(output_path)
+        new_pdf.save(output_path, object_stream_mode=pikepdf.ObjectStreamMode.generate)
         module_logger.info(f"Successfully saved merged PDF to '{output_path}'")
     except Exception as e_save:
         error_detail = f"Failed to save merged PDF '{output_path}': {str(e_save).splitlines()[0]}"
@@ -72,9 +93,7 @@ def _combine_pdfs_for_api(input_dir: str, files_to_combine: list, output_path: s
         # Add a specific failure for the output file itself.
         failed_file_details.append((os.path.basename(output_path), error_detail))
     finally:
-        # pikepdf objects are context managed by 'with', but if new_pdf was created outside,
-        # it doesn't have a close method like file objects. It's managed by Python's GC.
-        pass
+        _close_pdfs([new_pdf] + open_sources)
         
     return succeeded_filenames, failed_file_details
 
@@ -94,8 +113,8 @@ def _combine_txts_for_api(input_dir: str, files_to_combine: list, output_path: s
                 file_path = os.path.join(input_dir, filename)
                 try:
                     with open(file_path, 'r', encoding='utf-8', errors='replace') as infile:
-                        content = infile.read()
-                        outfile.write(content)
+                        # Copied in 1 MiB chunks rather than read() whole, so memory stays flat for large inputs
+                        shutil.copyfileobj(infile, outfile, _TXT_COPY_CHUNK_CHARS)
                         outfile.write('\n') # Add a newline between concatenated files
                     succeeded_filenames.append(filename)
                     module_logger.info(f"Successfully appended '{filename}' to '{os.path.basename(output_path)}'.")
@@ -149,10 +168,11 @@ def combine_files_api(input_dir: str, output_dir: str, file_type_char: str, outp
 
     # Get list of files to combine, sorted naturally
     try:
-        files_to_combine = sorted(
-            [f for f in os.listdir(input_dir) if f.lower().endswith(target_extension)],
-            key=natural_sort_key
-        )
+        with os.scandir(input_dir) as it: # is_file() from the listing: no stat per entry, directories skipped
+            files_to_combine = sorted(
+                [e.name for e in it if e.name.lower().endswith(target_extension) and e.is_file()],
+                key=natural_sort_key
+            )
     except Exception as e:
         msg = f"Could not read input directory '{input_dir}': {e}"
         module_logger.error(msg)
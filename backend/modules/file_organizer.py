@@ -222,11 +222,11 @@ def organize_files_by_group_api(input_dir: str,
         return {"success": False, "messages": [f"[ERROR] {msg}"], "error_count": 1}
 
     try:
-        all_target_files = [
-            f for f in os.listdir(input_dir)
-            if os.path.isfile(os.path.join(input_dir, f)) and 
-               os.path.splitext(f)[1].lower() in target_extensions
-        ]
+        with os.scandir(input_dir) as it:
+            all_target_files = [
+                e.name for e in it
+                if os.path.splitext(e.name)[1].lower() in target_extensions and e.is_file()
+            ]
     except Exception as e:
         msg = f"Could not read input directory '{input_dir}': {e}"
         module_logger.error(msg)
@@ -1,12 +1,30 @@
 import os
 import re
+import errno
 import shutil
 import time
 import unicodedata
 import logging
+import functools
+from collections import Counter
 from tqdm import tqdm
 from pypinyin import pinyin, Style
 
+# Directories the recursive operations never descend into: the tool's own output folders (the frontend
+# writes to <input>/processed_files) plus VCS and bytecode caches
+EXCLUDED_DIR_NAMES = frozenset({"processed_files", "decoded_files", ".git", "__pycache__"})
+
+# Patterns used once per filename, compiled up front
+_WHITESPACE_RUN_RE = re.compile(r'\s+')
+_EXISTING_PREFIX_RE = re.compile(r'^[A-Za-z\u4e00-\u9fff]-')
+_FIRST_LETTER_RE = re.compile(r'([\u4e00-\u9fff]|[A-Za-z])')
+_HAN_CHAR_RE = re.compile(r'[\u4e00-\u9fff]')
+_ASCII_LETTER_RE = re.compile(r'[A-Za-z]')
+_ALL_DIGITS_RE = re.compile(r'^\d+$')
+_NON_NUMBER_CHARS_RE = re.compile(r'[^0-9-]')
+_DIGIT_RE = re.compile(r'\d')
+_PREFIXED_NAME_RE = re.compile(r'^([A-Z\u4e00-\u9fff])-(.+)$')
+
 def normalize_str(s: str) -> str:
     """
     Normalizes a string using NFC (Normalization Form Canonical Composition).
@@ -17,6 +35,35 @@ def normalize_str(s: str) -> str:
     """
     return unicodedata.normalize('NFC', s)
 
+def _name_key(name: str) -> str:
+    """
+    Comparison key for names in one directory: NFC-normalized and casefolded, so names that macOS and Windows
+    filesystems treat as the same entry also collide here (on case-sensitive filesystems this errs on the safe side).
+    """
+    return unicodedata.normalize('NFC', name).casefold()
+
+def _record_rename(taken: Counter, old_name: str, new_name: str) -> None:
+    """
+    Internal helper: Updates a Counter of _name_key values after old_name was renamed (or moved in) as new_name;
+    old_name may be None. The rename loops check candidate names against such a Counter instead of os.path.exists.
+    """
+    if old_name is not None:
+        old_key = _name_key(old_name)
+        taken[old_key] -= 1
+        if taken[old_key] <= 0:
+            del taken[old_key]
+    taken[_name_key(new_name)] += 1
+
+def _name_taken(taken: Counter, name: str, own_name: str) -> bool:
+    """
+    Internal helper: Whether renaming own_name to name would collide with another entry in taken. own_name's
+    own key doesn't count, so case-only renames (a.pdf -> A.pdf) aren't pushed to a suffixed name.
+    """
+    if name == own_name:
+        return False
+    key = _name_key(name)
+    return taken[key] > (1 if key == _name_key(own_name) else 0)
+
 def clean_name(filename: str) -> str:
     """
     Cleans a filename by removing author names in brackets, extensions,
@@ -48,12 +95,17 @@ def clean_name(filename: str) -> str:
         filename = filename[:cut_pos].strip()
 
         # Compress multiple spaces into a single space
-        filename = re.sub(r'\s+', ' ', filename)
+        filename = _WHITESPACE_RUN_RE.sub(' ', filename)
         return filename
     except Exception as e:
         module_logger.error(f"Error cleaning name for '{filename}': {e}")
         return filename # Return original on error to avoid breaking further ops
 
+@functools.lru_cache(maxsize=4096)
+def _hanzi_initial(ch: str) -> str:
+    """Returns the uppercase pinyin initial of a Chinese character; cached, as few distinct first characters recur across a directory."""
+    return pinyin(ch, style=Style.FIRST_LETTER)[0][0].upper()
+
 def _generate_new_name(original_name: str, module_logger: logging.Logger) -> str:
     """
     Generates a standardized filename (internal function).
@@ -67,8 +119,8 @@ def _generate_new_name(original_name: str, module_logger: logging.Logger) -> str
         module_logger.error(f"Invalid original name provided for prefix generation: {original_name}")
         return original_name
 
-    clean_val = re.sub(r'^[A-Za-z\u4e00-\u9fff]-', '', original_name)
-    first_char_match = re.search(r'([\u4e00-\u9fff]|[A-Za-z])', clean_val)
+    clean_val = _EXISTING_PREFIX_RE.sub('', original_name)
+    first_char_match = _FIRST_LETTER_RE.search(clean_val)
 
     if not first_char_match:
         module_logger.warning(f"Could not determine first character for prefix generation from: '{clean_val}' (original: '{original_name}')")
@@ -77,9 +129,9 @@ def _generate_new_name(original_name: str, module_logger: logging.Logger) -> str
     prefix = ''
     try:
         first_char = first_char_match.group(1)
-        if re.match(r'[\u4e00-\u9fff]', first_char): # Chinese character
-            prefix = pinyin(first_char, style=Style.FIRST_LETTER)[0][0].upper()
-        elif re.match(r'[A-Za-z]', first_char): # English letter
+        if _HAN_CHAR_RE.match(first_char): # Chinese character
+            prefix = _hanzi_initial(first_char)
+        elif _ASCII_LETTER_RE.match(first_char): # English letter
             prefix = first_char.upper()
         else:
             module_logger.warning(f"First character '{first_char}' is not Chinese or English letter, cannot generate pinyin prefix for: {original_name}")
@@ -113,25 +165,26 @@ def delete_filename_chars_api(input_dir: str, char_pattern: str) -> dict:
         module_logger.error(msg)
         return {"success": False, "messages": [f"[ERROR] {msg}"], "processed_count": 0, "error_count": 1}
 
+    # Compile once: an invalid pattern is reported a single time instead of once per item
+    try:
+        pattern = re.compile(char_pattern)
+    except re.error as e_re:
+        msg = f"Invalid regex pattern '{char_pattern}': {e_re}."
+        module_logger.error(msg)
+        return {"success": False, "messages": [f"[ERROR] {msg}"], "processed_count": 0, "error_count": 1}
+
     try:
-        items_in_dir = os.listdir(input_dir)
+        with os.scandir(input_dir) as it:
+            items_in_dir = [(entry.name, entry.path) for entry in it]
     except Exception as e:
         msg = f"Could not read directory '{input_dir}': {e}"
         module_logger.error(msg)
         return {"success": False, "messages": [f"[ERROR] {msg}"], "processed_count": 0, "error_count": 1}
 
-    for item_name in tqdm(items_in_dir, desc="API Deleting Chars", unit="item", disable=True):
-        old_path = os.path.join(input_dir, item_name)
-        
-        try:
-            new_item_name_candidate = re.sub(char_pattern, '', item_name)
-        except re.error as e_re:
-            msg = f"Invalid regex pattern '{char_pattern}': {e_re}. Skipping item '{item_name}'."
-            module_logger.error(msg)
-            messages.append(f"[ERROR] {msg}")
-            error_count += 1
-            overall_success = False
-            continue
+    taken = Counter(_name_key(name) for name, _ in items_in_dir)
+
+    for item_name, old_path in tqdm(items_in_dir, desc="API Deleting Chars", unit="item", disable=True):
+        new_item_name_candidate = pattern.sub('', item_name)
 
         if new_item_name_candidate != item_name:
             new_path_candidate = os.path.join(input_dir, new_item_name_candidate)
@@ -141,7 +194,7 @@ def delete_filename_chars_api(input_dir: str, char_pattern: str) -> dict:
             counter = 1
             
             # Handle potential conflicts if the new name already exists
-            while os.path.exists(final_new_path) and final_new_path != old_path:
+            while _name_taken(taken, final_new_name, item_name):
                 base, ext = os.path.splitext(new_item_name_candidate)
                 final_new_name = f"{base}_{counter}{ext}"
                 final_new_path = os.path.join(input_dir, final_new_name)
@@ -159,7 +212,10 @@ def delete_filename_chars_api(input_dir: str, char_pattern: str) -> dict:
                 continue
 
             try:
+                # os.rename rather than os.replace: if another item takes the name after the
+                # conflict check, this fails on Windows instead of silently overwriting it
                 os.rename(old_path, final_new_path)
+                _record_rename(taken, item_name, final_new_name)
                 msg = f"Renamed: '{item_name}' -> '{final_new_name}'"
                 module_logger.info(msg)
                 messages.append(f"[SUCCESS] {msg}")
@@ -208,17 +264,21 @@ def rename_items_api(input_dir: str, mode: str) -> dict:
         return {"success": False, "messages": [f"[ERROR] {msg}"], "renamed_count": 0, "skipped_count": 0, "error_count": 1}
 
     items_to_process = []
+    taken = Counter() # Every entry's name, including those not being renamed
     try:
-        for name in os.listdir(input_dir):
-            path = os.path.join(input_dir, name)
-            if mode == 'folders' and os.path.isdir(path):
-                items_to_process.append({'type': 'folder', 'name': name, 'path': path})
-            elif mode == 'files' and os.path.isfile(path):
-                items_to_process.append({'type': 'file', 'name': name, 'path': path})
-            elif mode == 'both':
-                item_type = 'folder' if os.path.isdir(path) else 'file' if os.path.isfile(path) else None
-                if item_type:
-                    items_to_process.append({'type': item_type, 'name': name, 'path': path})
+        # DirEntry.is_dir()/is_file() answer from the directory listing itself (following symlinks like
+        # os.path.isdir/isfile), so there is no extra stat per entry
+        with os.scandir(input_dir) as it:
+            for entry in it:
+                taken[_name_key(entry.name)] += 1
+                if mode == 'folders' and entry.is_dir():
+                    items_to_process.append({'type': 'folder', 'name': entry.name, 'path': entry.path})
+                elif mode == 'files' and entry.is_file():
+                    items_to_process.append({'type': 'file', 'name': entry.name, 'path': entry.path})
+                elif mode == 'both':
+                    item_type = 'folder' if entry.is_dir() else 'file' if entry.is_file() else None
+                    if item_type:
+                        items_to_process.append({'type': item_type, 'name': entry.name, 'path': entry.path})
     except Exception as e:
         msg = f"Error listing directory '{input_dir}': {e}"
         module_logger.error(msg)
@@ -255,7 +315,7 @@ def rename_items_api(input_dir: str, mode: str) -> dict:
         current_new_path = new_path_candidate
         counter = 1
 
-        while os.path.exists(current_new_path) and current_new_path != old_path:
+        while _name_taken(taken, current_new_name_for_conflict, old_name):
             base, ext = os.path.splitext(final_new_item_name)
             current_new_name_for_conflict = f"{base}_{counter}{ext}"
             current_new_path = os.path.join(input_dir, current_new_name_for_conflict)
@@ -274,6 +334,7 @@ def rename_items_api(input_dir: str, mode: str) -> dict:
 
         try:
             os.rename(old_path, current_new_path)
+            _record_rename(taken, old_name, current_new_name_for_conflict)
             msg = f"Renamed: '{old_name}' -> '{os.path.basename(current_new_path)}'"
             module_logger.info(msg)
             messages.append(f"[SUCCESS] {msg}")
@@ -314,12 +375,20 @@ def flatten_directories_api(input_dir: str) -> dict:
         return {"success": False, "messages": [f"[ERROR] {msg}"], "moved_files_count":0, "deleted_dirs_count":0, "conflict_skips":0, "error_count":1}
 
     # Phase 1: Move files
-    # Collect all files to be moved first to avoid issues with os.walk on changing directories
+    # Collect all files to be moved first to avoid issues with os.walk on changing directories.
+    # The same walk records every visited subdirectory (parents before children) for phase 2.
+    # The walk's first step lists the root itself, which also seeds the index of names already taken there.
     files_to_move = []
+    subdirs_topdown = []
+    taken = Counter()
     try:
-        for root, _, files in os.walk(input_dir):
+        for root, dirs, files in os.walk(input_dir):
             if root == input_dir:  # Don't process files already in the root
+                taken.update(_name_key(name) for name in dirs + files)
+                dirs[:] = [d for d in dirs if d not in EXCLUDED_DIR_NAMES] # Prune output/VCS dirs in place
                 continue
+            dirs[:] = [d for d in dirs if d not in EXCLUDED_DIR_NAMES]
+            subdirs_topdown.append(root)
             for file_item in files:
                 files_to_move.append({'src': os.path.join(root, file_item), 'name': file_item})
     except Exception as e_walk:
@@ -336,14 +405,8 @@ def flatten_directories_api(input_dir: str) -> dict:
         current_dest_path = dest_path_candidate
         counter = 1
 
-        while os.path.exists(current_dest_path):
-            # Important: if src_path is the same as current_dest_path, it means the file is already in the root.
-            # This shouldn't happen with the `if root == input_dir: continue` logic, but as a safeguard:
-            if os.path.samefile(src_path, current_dest_path):
-                 module_logger.debug(f"File '{original_name}' is already at destination or is the same file. Skipping move.")
-                 current_dest_path = None # Mark to skip move
-                 break
-
+        # Sources all come from subdirectories (the walk skips the root), so a taken name is always another entry
+        while taken[_name_key(current_dest_name)]:
             base, ext = os.path.splitext(original_name)
             current_dest_name = f"{base}_{counter}{ext}"
             current_dest_path = os.path.join(input_dir, current_dest_name)
@@ -362,7 +425,15 @@ def flatten_directories_api(input_dir: str) -> dict:
             continue
 
         try:
-            shutil.move(src_path, current_dest_path)
+            # Source and destination are both under input_dir, so a plain rename normally suffices; shutil.move
+            # (copy + delete) is only needed when a subdirectory is another filesystem's mount point.
+            try:
+                os.rename(src_path, current_dest_path)
+            except OSError as e_rename:
+                if e_rename.errno != errno.EXDEV:
+                    raise
+                shutil.move(src_path, current_dest_path)
+            _record_rename(taken, None, current_dest_name)
             moved_files_count += 1
             messages.append(f"[SUCCESS] Moved '{original_name}' from '{os.path.dirname(src_path)}' to '{current_dest_name}' in root.")
         except Exception as e_move:
@@ -376,35 +447,28 @@ def flatten_directories_api(input_dir: str) -> dict:
 
     # Phase 2: Delete empty directories
     module_logger.info(f"API: Cleaning up empty subdirectories in '{input_dir}'")
-    deleted_dirs_this_pass = -1 # Loop sentinel
-    while deleted_dirs_this_pass != 0 : # Loop until no more empty dirs are deleted in a pass
-        deleted_dirs_this_pass = 0
-        # Walk from bottom up to remove nested empty directories correctly
-        for root, dirs, files_in_subdir in os.walk(input_dir, topdown=False):
-            if root == input_dir:
-                continue # Don't try to delete the input directory itself
-
-            is_empty = not os.listdir(root) # More direct check for emptiness
-
-            if is_empty:
-                try:
-                    os.rmdir(root) # Use os.rmdir for empty dirs; shutil.rmtree for non-empty (but we expect empty)
-                    deleted_dirs_count += 1
-                    deleted_dirs_this_pass +=1
-                    messages.append(f"[SUCCESS] Deleted empty directory: '{root}'")
-                except OSError as e_rmdir: # os.rmdir raises OSError if not empty or other issues
-                    # This might happen if a .DS_Store or other hidden file remains
-                    msg = f"Could not delete directory '{root}': {e_rmdir}. It might not be truly empty or access denied."
-                    module_logger.warning(msg) # Log as warning, might not be a critical error
-                    messages.append(f"[WARN] {msg}")
-                    # error_count += 1 # Optionally count this as an error
-                    # overall_success = False
-                except Exception as e_generic_rm:
-                    msg = f"Unexpected error deleting directory '{root}': {e_generic_rm}"
-                    module_logger.error(msg)
-                    messages.append(f"[ERROR] {msg}")
-                    error_count += 1
-                    overall_success = False
+    # Reversed top-down order visits children before their parents, so one pass removes nested empty
+    # directories without re-walking the tree. Excluded directories were never recorded.
+    # os.rmdir itself refuses non-empty directories, so it doubles as the emptiness check (no listing per directory).
+    for root in reversed(subdirs_topdown):
+        try:
+            os.rmdir(root)
+            deleted_dirs_count += 1
+            messages.append(f"[SUCCESS] Deleted empty directory: '{root}'")
+        except OSError as e_rmdir:
+            if e_rmdir.errno in (errno.ENOTEMPTY, errno.EEXIST): # Still has content (e.g. skipped files); left alone
+                continue
+            msg = f"Could not delete directory '{root}': {e_rmdir}. It might not be truly empty or access denied."
+            module_logger.warning(msg) # Log as warning, might not be a critical error
+            messages.append(f"[WARN] {msg}")
+            # error_count += 1 # Optionally count this as an error
+            # overall_success = False
+        except Exception as e_generic_rm:
+            msg = f"Unexpected error deleting directory '{root}': {e_generic_rm}"
+            module_logger.error(msg)
+            messages.append(f"[ERROR] {msg}")
+            error_count += 1
+            overall_success = False
     
     final_summary = (f"Directory flattening finished. Moved files: {moved_files_count}, "
                      f"Deleted empty directories: {deleted_dirs_count}, "
@@ -439,7 +503,8 @@ def add_filename_prefix_api(input_dir: str, prefix: str, processed_files_list: l
         return {"success": False, "messages": [f"[ERROR] {msg}"], "processed_count": 0, "skipped_count": 0, "error_count": 1}
 
     try:
-        items_in_dir = os.listdir(input_dir)
+        with os.scandir(input_dir) as it:
+            entries_in_dir = list(it)
     except Exception as e:
         msg = f"Could not read directory '{input_dir}': {e}"
         module_logger.error(msg)
@@ -449,8 +514,9 @@ def add_filename_prefix_api(input_dir: str, prefix: str, processed_files_list: l
         processed_files_list = []
 
     target_items = []
-    for item_name in items_in_dir:
-        full_path = os.path.join(input_dir, item_name)
+    taken = Counter(_name_key(entry.name) for entry in entries_in_dir)
+    for entry in entries_in_dir:
+        item_name, full_path = entry.name, entry.path
         if item_name.startswith(prefix):
             msg = f"Skipping '{item_name}': already has prefix '{prefix}'."
             module_logger.info(msg)
@@ -458,8 +524,8 @@ def add_filename_prefix_api(input_dir: str, prefix: str, processed_files_list: l
             skipped_count += 1
             continue
         
-        is_target_file_type = os.path.isfile(full_path) and item_name.lower().endswith(('.pdf', '.txt', '.epub'))
-        is_directory = os.path.isdir(full_path)
+        is_target_file_type = entry.is_file() and item_name.lower().endswith(('.pdf', '.txt', '.epub'))
+        is_directory = entry.is_dir()
 
         if is_target_file_type or is_directory:
             if item_name in processed_files_list:
@@ -489,7 +555,7 @@ def add_filename_prefix_api(input_dir: str, prefix: str, processed_files_list: l
         final_new_path = new_path_candidate
         counter = 1
 
-        while os.path.exists(final_new_path) and final_new_path != old_path :
+        while _name_taken(taken, final_new_name, old_name):
             if is_dir_item:
                 base_name_for_conflict = new_name_candidate # Directory name
                 ext_for_conflict = ""
@@ -513,6 +579,7 @@ def add_filename_prefix_api(input_dir: str, prefix: str, processed_files_list: l
 
         try:
             os.rename(old_path, final_new_path)
+            _record_rename(taken, old_name, final_new_name)
             msg = f"Prefixed: '{old_name}' -> '{final_new_name}'"
             module_logger.info(msg)
             messages.append(f"[SUCCESS] {msg}")
@@ -553,7 +620,10 @@ def extract_numbers_in_filenames_api(input_dir: str) -> dict:
         return {"success": False, "messages": [f"[ERROR] {msg}"], "processed_new_filenames": [], "skipped_count": 0, "error_count": 1, "failed_details": []}
 
     try:
-        all_files_in_dir = [f for f in os.listdir(input_dir) if os.path.isfile(os.path.join(input_dir, f))]
+        with os.scandir(input_dir) as it:
+            entries_in_dir = list(it)
+        all_files_in_dir = [e.name for e in entries_in_dir if e.is_file()]
+        taken = Counter(_name_key(e.name) for e in entries_in_dir) # Directories' names count as taken too
     except Exception as e:
         msg = f"Could not read directory '{input_dir}': {e}"
         module_logger.error(msg)
@@ -563,17 +633,17 @@ def extract_numbers_in_filenames_api(input_dir: str) -> dict:
         src_path = os.path.join(input_dir, old_filename)
         base_without_ext, original_ext = os.path.splitext(old_filename)
 
-        if re.fullmatch(r'^\d+$', base_without_ext):
+        if _ALL_DIGITS_RE.fullmatch(base_without_ext):
             msg = f"Skipping purely numeric file base: '{old_filename}'"
             module_logger.info(msg)
             messages.append(f"[SKIP] {msg}")
             skipped_count += 1
             continue
 
-        numbers_part = re.sub(r'[^0-9-]', '', base_without_ext) # Operate on base, then add ext
+        numbers_part = _NON_NUMBER_CHARS_RE.sub('', base_without_ext) # Operate on base, then add ext
         numbers_part = numbers_part.lstrip('-').rstrip('-')
 
-        if not re.search(r'\d', numbers_part): # Check if any digit remains
+        if not _DIGIT_RE.search(numbers_part): # Check if any digit remains
             msg = f"No numbers found in filename base: '{old_filename}'. Skipping."
             module_logger.info(msg) # Changed to info as it's an expected skip
             messages.append(f"[SKIP] {msg}")
@@ -587,7 +657,7 @@ def extract_numbers_in_filenames_api(input_dir: str) -> dict:
         final_new_path = new_path_candidate
         counter = 1
 
-        while os.path.exists(final_new_path) and final_new_path != src_path:
+        while _name_taken(taken, final_new_name, old_filename):
             base_conflict, ext_conflict = os.path.splitext(new_name_candidate)
             final_new_name = f"{base_conflict}_{counter}{ext_conflict}"
             final_new_path = os.path.join(input_dir, final_new_name)
@@ -607,6 +677,7 @@ def extract_numbers_in_filenames_api(input_dir: str) -> dict:
 
         try:
             os.rename(src_path, final_new_path)
+            _record_rename(taken, old_filename, final_new_name)
             messages.append(f"[SUCCESS] Renamed: '{old_filename}' -> '{final_new_name}'")
             processed_new_filenames.append(final_new_name)
         except Exception as e_rename:
@@ -655,16 +726,17 @@ def reverse_rename_api(input_dir: str) -> dict:
         return {"success": False, "messages": [f"[ERROR] {msg}"], "renamed_count": 0, "skipped_count":0, "error_count": 1, "failed_details": []}
 
     try:
-        items_in_dir = os.listdir(input_dir)
+        with os.scandir(input_dir) as it:
+            items_in_dir = [(entry.name, entry.path, entry.is_file()) for entry in it]
     except Exception as e:
         msg = f"Could not read directory '{input_dir}': {e}"
         module_logger.error(msg)
         return {"success": False, "messages": [f"[ERROR] {msg}"], "renamed_count": 0, "skipped_count":0, "error_count": 1, "failed_details": []}
 
-    for old_name in tqdm(items_in_dir, desc="API Reverse Renaming", unit="item", disable=True):
-        old_path = os.path.join(input_dir, old_name)
+    taken = Counter(_name_key(name) for name, _, _ in items_in_dir)
+    for old_name, old_path, is_file_item in tqdm(items_in_dir, desc="API Reverse Renaming", unit="item", disable=True):
         
-        match = re.match(r'^([A-Z\u4e00-\u9fff])-(.+)$', old_name)
+        match = _PREFIXED_NAME_RE.match(old_name)
         if not match:
             msg = f"Skipping '{old_name}': does not match 'X-name' format."
             # module_logger.debug(msg) # Can be debug if too verbose for info
@@ -686,9 +758,8 @@ def reverse_rename_api(input_dir: str) -> dict:
         final_new_path = new_path_candidate
         counter = 1
 
-        while os.path.exists(final_new_path) and final_new_path != old_path:
-            # Determine if it's a file or dir for proper extension handling in conflict
-            is_file_item = os.path.isfile(old_path) # Check original type
+        while _name_taken(taken, final_new_name, old_name):
+            # Files keep their extension after the counter; directories get it appended
             base_conflict, ext_conflict = os.path.splitext(new_name_candidate) if is_file_item else (new_name_candidate, "")
 
             final_new_name = f"{base_conflict}_{counter}{ext_conflict}"
@@ -709,6 +780,7 @@ def reverse_rename_api(input_dir: str) -> dict:
 
         try:
             os.rename(old_path, final_new_path)
+            _record_rename(taken, old_name, final_new_name)
             msg = f"Reverse renamed: '{old_name}' -> '{final_new_name}'"
             module_logger.info(msg)
             messages.append(f"[SUCCESS] {msg}")
@@ -759,7 +831,8 @@ def add_filename_suffix_api(input_dir: str, suffix: str, processed_files_list: l
         return {"success": False, "messages": [f"[ERROR] {msg}"], "processed_count": 0, "skipped_count": 0, "error_count": 1}
 
     try:
-        items_in_dir = os.listdir(input_dir)
+        with os.scandir(input_dir) as it:
+            entries_in_dir = list(it)
     except Exception as e:
         msg = f"Could not read directory '{input_dir}': {e}"
         module_logger.error(msg)
@@ -769,8 +842,9 @@ def add_filename_suffix_api(input_dir: str, suffix: str, processed_files_list: l
         processed_files_list = []
 
     target_items = []
-    for item_name in items_in_dir:
-        full_path = os.path.join(input_dir, item_name)
+    taken = Counter(_name_key(entry.name) for entry in entries_in_dir)
+    for entry in entries_in_dir:
+        item_name, full_path = entry.name, entry.path
         base_name, ext = os.path.splitext(item_name)
         if base_name.endswith(suffix):
             msg = f"Skipping '{item_name}': already has suffix '{suffix}'."
@@ -779,8 +853,8 @@ def add_filename_suffix_api(input_dir: str, suffix: str, processed_files_list: l
             skipped_count += 1
             continue
         
-        is_target_file_type = os.path.isfile(full_path) and item_name.lower().endswith(('.pdf', '.txt', '.epub'))
-        is_directory = os.path.isdir(full_path)
+        is_target_file_type = entry.is_file() and item_name.lower().endswith(('.pdf', '.txt', '.epub'))
+        is_directory = entry.is_dir()
 
         if is_target_file_type or is_directory:
             if item_name in processed_files_list:
@@ -816,7 +890,7 @@ def add_filename_suffix_api(input_dir: str, suffix: str, processed_files_list: l
         final_new_path = new_path_candidate
         counter = 1
 
-        while os.path.exists(final_new_path) and final_new_path != old_path:
+        while _name_taken(taken, final_new_name, old_name):
             if is_dir_item:
                 base_name_for_conflict = new_name_candidate
                 ext_for_conflict = ""
@@ -840,6 +914,7 @@ def add_filename_suffix_api(input_dir: str, suffix: str, processed_files_list: l
 
         try:
             os.rename(old_path, final_new_path)
+            _record_rename(taken, old_name, final_new_name)
             msg = f"Suffixed: '{old_name}' -> '{final_new_name}'"
             module_logger.info(msg)
             messages.append(f"[SUCCESS] {msg}")
@@ -2,15 +2,30 @@
 import os
 import shutil
 import logging
+import tempfile
 import time
 from tqdm import tqdm
 from pathlib import Path
 import zipfile
 import py7zr
+from ._parallel import run_jobs
 
 
 module_logger = logging.getLogger(__name__)
 
+# Archive decoding is dominated by zlib/LZMA work and file I/O, both of which release the GIL,
+# so threads overlap well here; the bound keeps disk contention and decoder memory in check.
+_DEFAULT_MAX_WORKERS = min(os.cpu_count() or 1, 4)
+
+
+def _remove_if_present(path: str) -> None:
+    """Internal helper: Removes a file in one call, treating an already-missing file as removed (no exists() check/race)."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
 def encode_folders_with_double_compression_api(input_dir: str, password: str = "1111") -> dict:
     """
     API-adapted: Encodes and double-compresses items using Python libraries (py7zr, zipfile).
@@ -138,12 +153,11 @@ def encode_folders_with_double_compression_api(input_dir: str, password: str = "
         finally:
             # Cleanup any temp files if they still exist from this item's processing
             for temp_file in [sevenz_temp_path, renamed_sevenz_path, zip_temp_path]:
-                if os.path.exists(temp_file):
-                    try: os.remove(temp_file)
-                    except Exception as e_clean: 
-                        messages.append(f"[WARN] Failed to clean temp file '{os.path.basename(temp_file)}': {e_clean}")
-            if not current_item_success and os.path.exists(final_output_path): # If failed, remove potentially incomplete final output
-                 try: os.remove(final_output_path)
+                try: _remove_if_present(temp_file)
+                except Exception as e_clean: 
+                    messages.append(f"[WARN] Failed to clean temp file '{os.path.basename(temp_file)}': {e_clean}")
+            if not current_item_success: # If failed, remove potentially incomplete final output
+                 try: _remove_if_present(final_output_path)
                  except Exception as e_clean_final:
                      messages.append(f"[WARN] Failed to clean potentially incomplete final output '{os.path.basename(final_output_path)}': {e_clean_final}")
 
@@ -164,24 +178,125 @@ def encode_folders_with_double_compression_api(input_dir: str, password: str = "
     }
 
 
-def decode_folders_with_double_decompression_api(input_dir: str, password: str = "1111") -> dict:
+def _move_into_place(src: str, dst: str) -> None:
+    """
+    Internal helper: Moves extracted content src to dst. Directories that already exist at dst are merged entry by
+    entry and existing files are replaced, which is what extracting straight into the target directory did.
+    """
+    if os.path.isdir(src) and os.path.isdir(dst):
+        for name in os.listdir(src):
+            _move_into_place(os.path.join(src, name), os.path.join(dst, name))
+        return
+    try:
+        os.replace(src, dst)
+    except OSError:
+        if not os.path.isdir(src):
+            raise
+        # dst appeared concurrently (another archive with the same top-level folder), or is a
+        # non-empty directory os.replace can't take over: merge into it instead
+        os.makedirs(dst, exist_ok=True)
+        _move_into_place(src, dst)
+
+def _decode_one(encoded_filename: str, input_dir: str, password: str) -> dict:
+    """
+    Internal helper (thread pool worker): Decodes one encoded archive (suffix `.z删ip`) into input_dir.
+    Every step runs in a private work directory under input_dir, and the extracted content is moved into input_dir
+    only once the archive has decoded completely, so concurrent archives sharing a top-level name never see each
+    other's partial output, and a failed archive only has its own work directory to clean up.
+    Returns a result record: {"file", "ok", "messages", "detail", "error"}.
+    """
+    messages = []
+    full_zsanip_path = os.path.join(input_dir, encoded_filename)
+    base_name = os.path.splitext(encoded_filename)[0]
+    work_dir = None
+
+    # Temporary and intermediate file names (created inside work_dir)
+    temp_zip_filename = f"{base_name}.zip"
+    expected_7sanz_in_zip = f"{base_name}.7删z"
+    final_7z_filename = f"{base_name}.7z"
+
+    current_archive_success = True
+    extracted_content_final_name = None
+    detail = None
+    error = None
+
+    try:
+        work_dir = tempfile.mkdtemp(prefix="~decoding_", dir=input_dir)
+        temp_zip_path = os.path.join(work_dir, temp_zip_filename)
+        extracted_7sanz_path = os.path.join(work_dir, expected_7sanz_in_zip)
+        final_7z_path = os.path.join(work_dir, final_7z_filename)
+        content_dir = os.path.join(work_dir, "content")
+
+        # Step 1: Copy and rename to .zip
+        module_logger.info(f"Decoding '{encoded_filename}': Step 1/4 - Copying and renaming to '{temp_zip_filename}'...")
+        shutil.copy2(full_zsanip_path, temp_zip_path)
+        messages.append(f"[INFO] Copied '{encoded_filename}' to '{temp_zip_filename}'.")
+
+        # Step 2: Extract the `.7删z` member from the `.zip` copy
+        module_logger.info(f"Decoding '{encoded_filename}': Step 2/4 - Decompressing '{temp_zip_filename}'...")
+        with zipfile.ZipFile(temp_zip_path, 'r') as zf:
+            if expected_7sanz_in_zip not in zf.namelist():
+                raise FileNotFoundError(f"'{expected_7sanz_in_zip}' not found inside '{temp_zip_filename}'. Available: {zf.namelist()}")
+            zf.extract(expected_7sanz_in_zip, path=work_dir)
+        messages.append(f"[INFO] Extracted '{expected_7sanz_in_zip}' from zip.")
+        
+        if not os.path.exists(extracted_7sanz_path):
+            raise FileNotFoundError(f"Intermediate file '{expected_7sanz_in_zip}' not found after ZIP extraction.")
+
+        # Step 3: Rename to .7z
+        module_logger.info(f"Decoding '{encoded_filename}': Step 3/4 - Renaming '{expected_7sanz_in_zip}' to '{final_7z_filename}'...")
+        os.rename(extracted_7sanz_path, final_7z_path)
+        messages.append(f"[INFO] Renamed to '{final_7z_filename}'.")
+
+        # Step 4: Extract contents with password, then move them into input_dir
+        module_logger.info(f"Decoding '{encoded_filename}': Step 4/4 - Decompressing '{final_7z_filename}' to '{input_dir}'...")
+        with py7zr.SevenZipFile(final_7z_path, 'r', password=password) as archive:
+            archive_names = archive.getnames()
+            if archive_names: # Get the name of the first item, assuming it's the root folder/file
+                extracted_content_final_name = archive_names[0].split(os.sep)[0] # Get top-level item name
+            archive.extractall(path=content_dir)
+        if os.path.isdir(content_dir):
+            for name in os.listdir(content_dir):
+                _move_into_place(os.path.join(content_dir, name), os.path.join(input_dir, name))
+        messages.append(f"[SUCCESS] Decompressed '{final_7z_filename}'. Extracted content: '{extracted_content_final_name or 'content'}'")
+        detail = {"encoded_file": encoded_filename, "extracted_content_name": extracted_content_final_name or "Unknown"}
+
+    except py7zr.exceptions.PasswordRequired:
+        error_msg_detail = f"Decoding failed for '{encoded_filename}': Password required or incorrect for 7z archive."
+        module_logger.error(error_msg_detail)
+        messages.append(f"[ERROR] {error_msg_detail}")
+        error = "Incorrect 7z password or password required."
+        current_archive_success = False
+    except Exception as e:
+        error_msg_detail = f"Decoding failed for '{encoded_filename}': {type(e).__name__} - {str(e).splitlines()[0]}"
+        module_logger.error(error_msg_detail, exc_info=False)
+        messages.append(f"[ERROR] {error_msg_detail}")
+        error = error_msg_detail
+        current_archive_success = False
+    finally:
+        # Intermediate files and any partially extracted content live only in work_dir
+        if work_dir is not None:
+            try:
+                shutil.rmtree(work_dir)
+            except Exception as e_clean:
+                messages.append(f"[WARN] Failed to clean temp directory '{os.path.basename(work_dir)}': {e_clean}")
+
+    return {"file": encoded_filename, "ok": current_archive_success, "messages": messages, "detail": detail, "error": error}
+
+
+def decode_folders_with_double_decompression_api(input_dir: str, password: str = "1111", max_workers: int = None) -> dict:
     """
     API-adapted: Decodes and double-decompresses .z删ip files using Python libraries.
-    Decoded contents are extracted into the input_dir.
+    Decoded contents are extracted into the input_dir. Archives are decoded concurrently.
     Args:
         input_dir (str): Directory containing .z删ip files and where output will be placed.
         password (str): Password for 7z decryption.
+        max_workers (int, optional): Number of decoding threads. Defaults to min(CPU count, 4).
     Returns:
         dict: Operation results including success status and processed files details.
     """
     module_logger.info(f"API: Starting double decompression (Python libs) in '{input_dir}' with provided password.")
     messages = []
-    successful_files_details = []  # List of {"encoded_file": "...", "extracted_content_name": "..."}
-    failed_files_details = []      # List of {"encoded_file": "...", "error": "..."}
-    processed_archive_count = 0
-    success_count = 0
-    error_count = 0
-    overall_success = True
 
     # Input validation
     if not password:
@@ -209,91 +324,16 @@ def decode_folders_with_double_decompression_api(input_dir: str, password: str =
 
     total_archives_to_process = len(encoded_files)
 
-    # Process each encoded file
-    for encoded_filename in encoded_files:
-        full_zsanip_path = os.path.join(input_dir, encoded_filename)
-        base_name = os.path.splitext(encoded_filename)[0]
-        
-        # Temporary and intermediate file paths
-        temp_zip_filename = f"{base_name}.zip"
-        temp_zip_path = os.path.join(input_dir, temp_zip_filename)
-        expected_7sanz_in_zip = f"{base_name}.7删z"
-        extracted_7sanz_path = os.path.join(input_dir, expected_7sanz_in_zip)
-        final_7z_path = os.path.join(input_dir, f"{base_name}.7z")
-
-        processed_archive_count += 1
-        current_archive_success = True
-        extracted_content_final_name = None
-
-        try:
-            # Step 1: Copy and rename to .zip
-            module_logger.info(f"Decoding '{encoded_filename}': Step 1/4 - Copying and renaming to '{temp_zip_filename}'...")
-            shutil.copy2(full_zsanip_path, temp_zip_path)
-            messages.append(f"[INFO] Copied '{encoded_filename}' to '{temp_zip_filename}'.")
-
-            # Step 2: Extract .7删z from .zip
-            module_logger.info(f"Decoding '{encoded_filename}': Step 2/4 - Decompressing '{temp_zip_filename}'...")
-            with zipfile.ZipFile(temp_zip_path, 'r') as zf:
-                if expected_7sanz_in_zip not in zf.namelist():
-                    raise FileNotFoundError(f"'{expected_7sanz_in_zip}' not found inside '{temp_zip_filename}'. Available: {zf.namelist()}")
-                zf.extract(expected_7sanz_in_zip, path=input_dir)
-            messages.append(f"[INFO] Extracted '{expected_7sanz_in_zip}' from zip.")
-            
-            if not os.path.exists(extracted_7sanz_path):
-                raise FileNotFoundError(f"Intermediate file '{expected_7sanz_in_zip}' not found after ZIP extraction.")
-
-            # Step 3: Rename to .7z
-            module_logger.info(f"Decoding '{encoded_filename}': Step 3/4 - Renaming '{expected_7sanz_in_zip}' to '{os.path.basename(final_7z_path)}'...")
-            os.rename(extracted_7sanz_path, final_7z_path)
-            messages.append(f"[INFO] Renamed to '{os.path.basename(final_7z_path)}'.")
-
-            # Step 4: Extract contents with password
-            module_logger.info(f"Decoding '{encoded_filename}': Step 4/4 - Decompressing '{os.path.basename(final_7z_path)}' to '{input_dir}'...")
-            with py7zr.SevenZipFile(final_7z_path, 'r', password=password) as archive:
-                archive_names = archive.getnames()
-                if archive_names: # Get the name of the first item, assuming it's the root folder/file
-                    extracted_content_final_name = archive_names[0].split(os.sep)[0] # Get top-level item name
-                archive.extractall(path=input_dir)
-            messages.append(f"[SUCCESS] Decompressed '{os.path.basename(final_7z_path)}'. Extracted content: '{extracted_content_final_name or 'content'}'")
-            successful_files_details.append({"encoded_file": encoded_filename, "extracted_content_name": extracted_content_final_name or "Unknown"})
-            success_count +=1
-
-        except py7zr.exceptions.PasswordRequired:
-            error_msg_detail = f"Decoding failed for '{encoded_filename}': Password required or incorrect for 7z archive."
-            module_logger.error(error_msg_detail)
-            messages.append(f"[ERROR] {error_msg_detail}")
-            failed_files_details.append({"encoded_file": encoded_filename, "error": "Incorrect 7z password or password required."})
-            error_count += 1
-            overall_success = False
-            current_archive_success = False
-        except Exception as e:
-            error_msg_detail = f"Decoding failed for '{encoded_filename}': {type(e).__name__} - {str(e).splitlines()[0]}"
-            module_logger.error(error_msg_detail, exc_info=False)
-            messages.append(f"[ERROR] {error_msg_detail}")
-            failed_files_details.append({"encoded_file": encoded_filename, "error": error_msg_detail})
-            error_count += 1
-            overall_success = False
-            current_archive_success = False
-        finally:
-            # Clean up intermediate files
-            for temp_file in [temp_zip_path, extracted_7sanz_path, final_7z_path]:
-                if os.path.exists(temp_file):
-                    try: os.remove(temp_file)
-                    except Exception as e_clean:
-                        messages.append(f"[WARN] Failed to clean temp file '{os.path.basename(temp_file)}': {e_clean}")
-            
-            # Cleanup partially extracted content if this archive failed
-            if not current_archive_success and extracted_content_final_name:
-                path_to_cleanup = os.path.join(input_dir, extracted_content_final_name)
-                if os.path.exists(path_to_cleanup) and not path_to_cleanup.endswith(".z删ip"): # Basic safety
-                    module_logger.warning(f"Attempting to cleanup partially extracted content: '{path_to_cleanup}'")
-                    try:
-                        if os.path.isdir(path_to_cleanup): shutil.rmtree(path_to_cleanup)
-                        else: os.remove(path_to_cleanup)
-                        messages.append(f"[INFO] Cleaned up partially extracted '{extracted_content_final_name}'.")
-                    except Exception as e_clean_extracted:
-                         messages.append(f"[WARN] Failed to cleanup partially extracted '{extracted_content_final_name}': {e_clean_extracted}")
-
+    jobs = [(encoded_filename, input_dir, password) for encoded_filename in encoded_files]
+    results = run_jobs(_decode_one, jobs, max_workers or _DEFAULT_MAX_WORKERS, use_threads=True)
+    for record in results:
+        messages.extend(record["messages"])
+    processed_archive_count = len(results)
+    successful_files_details = [r["detail"] for r in results if r["ok"]]  # List of {"encoded_file": "...", "extracted_content_name": "..."}
+    failed_files_details = [{"encoded_file": r["file"], "error": r["error"]} for r in results if not r["ok"]]  # List of {"encoded_file": "...", "error": "..."}
+    success_count = len(successful_files_details)
+    error_count = len(failed_files_details)
+    overall_success = error_count == 0
 
     final_summary_msg = (f"Folder decoding process finished. Archives processed: {processed_archive_count}, "
                          f"Succeeded: {success_count}, Failed: {error_count}.")
@@ -3,11 +3,13 @@ import os
 import re
 import logging
 import time
+import functools
 from PIL import Image, ImageFile
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from tqdm import tqdm
 from pathlib import Path
 import fitz # PyMuPDF
+from ._parallel import init_worker_logging, run_jobs
 
 Image.MAX_IMAGE_PIXELS = None
 ImageFile.LOAD_TRUNCATED_IMAGES = True
@@ -16,14 +18,64 @@ module_logger = logging.getLogger(__name__)
 
 SUPPORTED_IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tiff', '.webp')
 
+# Page rendering is CPU-bound inside MuPDF (which isn't thread-safe), so pdf_to_images_api spreads PDFs over processes
+_DEFAULT_MAX_WORKERS = min(os.cpu_count() or 1, 8)
+# Smallest page range worth a worker of its own when a single PDF is split across processes
+_MIN_PAGES_PER_RANGE = 8
+
+_NAT_SPLIT = re.compile(r'(\d+)').split
+
+def _failed_range_record(pdf_file: str, msg: str) -> dict:
+    """Internal helper: Page-range record for a job whose worker raised (or whose process crashed)."""
+    return {"pdf_file": pdf_file, "pages_ok": 0, "pages_failed": 0, "first_error": None, "error": msg, "unprocessed": True}
+
+def _list_files_with_suffix(input_dir: str, suffixes) -> list:
+    """
+    Internal helper: Names of regular files in input_dir ending with suffixes (a str or tuple, case-insensitive).
+    One scandir pass; DirEntry.is_file() comes from the listing, so directories are skipped without a stat each.
+    """
+    with os.scandir(input_dir) as it:
+        return [e.name for e in it if e.name.lower().endswith(suffixes) and e.is_file()]
+
 def natural_sort_key(s: str) -> list:
     return [
         int(text) if text.isdigit() else text.lower()
-        for text in re.split(r'(\d+)', s)
+        for text in _NAT_SPLIT(s)
     ]
 
+def _compress_single_image(img_path_str: str, target_width: int):
+    """
+    Internal helper (pool worker): Loads one image, converts it to RGB and downsizes it to target_width.
+    Module-level so a ProcessPoolExecutor can pickle it. Returns the PIL.Image or a {"file", "error"} dict.
+    """
+    img_path = Path(img_path_str)
+    try:
+        with Image.open(img_path) as img:
+            # Decode, convert and resize all happen here in the worker, leaving the
+            # PDF writer with ready RGB pixels to encode. load() keeps the pixels of an
+            # image that needs neither step usable after its file is closed.
+            img.load()
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+            
+            if img.width > target_width:
+                ratio = target_width / img.width
+                new_height = int(img.height * ratio)
+                img = img.resize((target_width, new_height), Image.Resampling.LANCZOS)
+
+            if isinstance(img, ImageFile.ImageFile):
+                # Neither step applied; a plain Image copy pickles back from a worker process, the
+                # format plugin's ImageFile subclass (e.g. PngImageFile) does not
+                img = img.copy()
+            return img # Return the processed PIL.Image object
+    except Exception as e:
+        err_msg = f"Error compressing '{img_path.name}': {type(e).__name__} - {str(e).splitlines()[0]}"
+        module_logger.error(err_msg)
+        return {"file": img_path.name, "error": err_msg} # Return error dict
+
 def compress_images_api(input_dir: str, output_dir: str, output_pdf_filename: str = "compressed_images", 
-                        target_width: int = 1500, quality: int = 90, dpi: int = 300, max_workers: int = 5) -> dict:
+                        target_width: int = 1500, quality: int = 90, dpi: int = 300, max_workers: int = 5,
+                        use_processes: bool = False) -> dict:
     """
     API-adapted: Compresses images and generates a PDF.
     Args:
@@ -33,7 +85,10 @@ def compress_images_api(input_dir: str, output_dir: str, output_pdf_filename: st
         target_width (int): Target width for image resizing.
         quality (int): Quality for JPEG compression (0-100).
         dpi (int): DPI for the output PDF.
-        max_workers (int): Max worker threads for parallel compression.
+        max_workers (int): Max workers for parallel compression.
+        use_processes (bool): Compress in worker processes instead of threads. Pillow releases the GIL
+            while decoding and resizing, so threads usually suffice; processes can help for very large
+            source images at the cost of pickling every resized image back to this process.
     Returns:
         dict: Operation results.
     """
@@ -52,7 +107,7 @@ def compress_images_api(input_dir: str, output_dir: str, output_pdf_filename: st
 
     try:
         image_files = sorted(
-            [f for f in os.listdir(input_dir) if f.lower().endswith(SUPPORTED_IMAGE_EXTENSIONS)],
+            _list_files_with_suffix(input_dir, SUPPORTED_IMAGE_EXTENSIONS),
             key=natural_sort_key
         )
     except Exception as e:
@@ -75,52 +130,41 @@ def compress_images_api(input_dir: str, output_dir: str, output_pdf_filename: st
 
     total_images_to_process = len(image_files)
     
-    # Internal function for compressing a single image
-    def _compress_single_image(img_path_str: str):
-        img_path = Path(img_path_str)
-        try:
-            with Image.open(img_path) as img:
-                original_mode = img.mode
-                if img.mode not in ['RGB', 'L']: # Convert to RGB if not grayscale or RGB
-                    img = img.convert('RGB')
-                
-                if img.width > target_width:
-                    ratio = target_width / img.width
-                    new_height = int(img.height * ratio)
-                    img = img.resize((target_width, new_height), Image.Resampling.LANCZOS)
-
-                # For this function, we are creating a PDF, so we don't overwrite originals.
-                # We'll save compressed versions to a temporary subfolder or pass PIL objects.
-                # For simplicity with ThreadPoolExecutor, let's return PIL objects.
-                # If memory is a concern for very many large images, saving to temp files is better.
-                return img # Return the processed PIL.Image object
-        except Exception as e:
-            err_msg = f"Error compressing '{img_path.name}': {type(e).__name__} - {str(e).splitlines()[0]}"
-            module_logger.error(err_msg)
-            return {"file": img_path.name, "error": err_msg} # Return error dict
-
     processed_pil_images = []
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = [executor.submit(_compress_single_image, os.path.join(input_dir, f)) for f in image_files]
-        for i, future in enumerate(tqdm(futures, total=total_images_to_process, desc="API Compressing Images", unit="image", disable=True)):
-            try:
-                result = future.result()
+    compress_one = functools.partial(_compress_single_image, target_width=target_width)
+    if use_processes:
+        executor = ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker_logging,
+                                       initargs=(logging.getLogger().getEffectiveLevel(),))
+        map_kwargs = {"chunksize": 4}
+    else:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        map_kwargs = {}
+    with executor:
+        # map() yields results in input order as they complete, so no futures list is kept around;
+        # _compress_single_image catches its own errors and reports them as dicts
+        image_paths = (os.path.join(input_dir, f) for f in image_files)
+        results = executor.map(compress_one, image_paths, **map_kwargs)
+        collected = 0
+        try:
+            for image_file, result in zip(image_files, tqdm(results, total=total_images_to_process, desc="API Compressing Images", unit="image", disable=True)):
+                collected += 1
                 if isinstance(result, Image.Image):
                     processed_pil_images.append(result)
-                    messages.append(f"[SUCCESS] Compressed image: {image_files[i]}")
+                    messages.append(f"[SUCCESS] Compressed image: {image_file}")
                     individual_image_success_count +=1
-                elif isinstance(result, dict) and "error" in result: # Error dict returned
+                else: # Error dict returned
                     messages.append(f"[ERROR] {result['error']}")
                     individual_image_errors.append(result)
                     individual_image_error_count +=1
                     overall_success = False
-            except Exception as e_future: # Should be caught by _compress_single_image, but as a fallback
-                err_msg = f"Unexpected error processing future for {image_files[i]}: {e_future}"
-                module_logger.error(err_msg)
-                messages.append(f"[ERROR] {err_msg}")
-                individual_image_errors.append({"file": image_files[i], "error": err_msg})
+        except Exception as e_pool: # Only reachable when a worker process dies; map stops at that point
+            err_msg = f"Compression worker failed: {type(e_pool).__name__} - {str(e_pool).splitlines()[0] if str(e_pool) else ''}"
+            module_logger.error(err_msg)
+            messages.append(f"[ERROR] {err_msg}")
+            for image_file in image_files[collected:]:
+                individual_image_errors.append({"file": image_file, "error": err_msg})
                 individual_image_error_count +=1
-                overall_success = False
+            overall_success = False
 
 
     if not processed_pil_images:
@@ -142,22 +186,12 @@ def compress_images_api(input_dir: str, output_dir: str, output_pdf_filename: st
     pdf_generated_successfully = False
 
     try:
+        # Workers already returned RGB images, so they go to the PDF writer as-is
         first_image_to_save = processed_pil_images[0]
-        # Ensure first image is RGB for saving as PDF with append_images
-        if first_image_to_save.mode != 'RGB':
-            first_image_to_save = first_image_to_save.convert('RGB')
-            
-        images_to_append = []
-        for img_obj in processed_pil_images[1:]:
-            if img_obj.mode != 'RGB':
-                images_to_append.append(img_obj.convert('RGB'))
-            else:
-                images_to_append.append(img_obj)
-
         first_image_to_save.save(
             final_pdf_path,
             save_all=True,
-            append_images=images_to_append,
+            append_images=processed_pil_images[1:],
             resolution=float(dpi), # PyPDF2/Pillow use resolution for DPI
             quality=quality, # Applies to DCTDecode (JPEG) streams within PDF
             optimize=True
@@ -197,7 +231,130 @@ def compress_images_api(input_dir: str, output_dir: str, output_pdf_filename: st
     }
 
 
-def pdf_to_images_api(input_dir: str, output_dir: str, fmt: str = 'png', dpi: int = 300, quality: int = 90) -> dict:
+def _save_page_jpg(pix, image_output_path: str, quality: int):
+    img_pil = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+    img_pil.save(image_output_path, quality=quality, optimize=True, progressive=True)
+
+def _save_page_png(pix, image_output_path: str, quality: int):
+    # Encoded entirely inside MuPDF, no Pillow round-trip; quality doesn't apply to PNG
+    with open(image_output_path, 'wb') as f_img:
+        f_img.write(pix.tobytes(output='png'))
+
+def _pdf_to_images_one(pdf_file: str, input_dir: str, output_dir: str, is_jpg: bool, dpi: int, quality: int,
+                       first_page: int = 0, stop_page: int = None) -> dict:
+    """
+    Internal helper (process pool worker): Renders pages [first_page, stop_page) of one PDF (all pages by default)
+    into output_dir/<pdf name>/. Image names use the absolute page number, so ranges of one PDF never collide.
+    Returns a page-range result: {"pdf_file", "pages_ok", "pages_failed", "first_error", "error", "unprocessed"};
+    error is set when the range could not be rendered at all. _summarize_pdf_pages folds ranges into the per-PDF record.
+    """
+    part = {"pdf_file": pdf_file, "pages_ok": 0, "pages_failed": 0, "first_error": None, "error": None, "unprocessed": False}
+    input_path = os.path.join(input_dir, pdf_file)
+    pdf_base_name = os.path.splitext(pdf_file)[0]
+    # Each PDF gets its own subfolder in the output_dir
+    current_output_subdir = os.path.join(output_dir, pdf_base_name)
+    ext = '.jpg' if is_jpg else '.png'
+    save_page = _save_page_jpg if is_jpg else _save_page_png
+
+    try:
+        os.makedirs(current_output_subdir, exist_ok=True)
+    except Exception as e_mkdir:
+        part["error"] = f"Could not create subdirectory '{current_output_subdir}' for '{pdf_file}': {e_mkdir}"
+        part["unprocessed"] = True
+        return part # Skip this PDF
+
+    try:
+        doc = fitz.open(input_path)
+        for i in range(first_page, len(doc) if stop_page is None else stop_page):
+            pix = doc[i].get_pixmap(dpi=dpi)
+            image_filename = f"{pdf_base_name}_page_{i+1:03d}{ext}"
+            image_output_path = os.path.join(current_output_subdir, image_filename)
+
+            try:
+                save_page(pix, image_output_path, quality)
+                part["pages_ok"] += 1
+            except Exception as e_save:
+                part["pages_failed"] += 1
+                if part["first_error"] is None:
+                    part["first_error"] = f"page {i+1}: {e_save}"
+                # Lazy %-formatting: nothing is built per page unless ERROR is enabled
+                module_logger.error("Error saving page %d of '%s' as '%s': %s", i + 1, pdf_file, image_filename, e_save)
+        doc.close()
+    except Exception as e_open:
+        part["error"] = f"Failed to open or process PDF '{pdf_file}': {type(e_open).__name__} - {str(e_open).splitlines()[0]}"
+    return part
+
+def _split_pdf_page_ranges(pdf_files: list, input_dir: str, workers: int) -> list:
+    """
+    Internal helper: Splits PDFs into (pdf_file, first_page, stop_page) ranges so that a batch with fewer PDFs than
+    workers still keeps every worker busy. Each range costs one extra open of the PDF in its worker, so ranges are
+    kept to at least _MIN_PAGES_PER_RANGE pages; a PDF whose page count can't be read stays a single job.
+    """
+    page_counts = {}
+    for pdf_file in pdf_files:
+        try:
+            with fitz.open(os.path.join(input_dir, pdf_file)) as doc:
+                page_counts[pdf_file] = len(doc)
+        except Exception:
+            page_counts[pdf_file] = None # The worker reports the open error
+    total_pages = sum(n for n in page_counts.values() if n)
+    pages_per_range = max(_MIN_PAGES_PER_RANGE, -(-total_pages // workers))
+
+    ranges = []
+    for pdf_file in pdf_files:
+        n = page_counts[pdf_file]
+        if not n:
+            ranges.append((pdf_file, 0, None))
+            continue
+        ranges.extend((pdf_file, start, min(start + pages_per_range, n)) for start in range(0, n, pages_per_range))
+    return ranges
+
+def _summarize_pdf_pages(pdf_file: str, output_dir: str, parts: list) -> dict:
+    """
+    Internal helper: Folds the page-range results of one PDF (in page order) into its result record:
+    {"pdf_file", "processed", "images_created", "messages", "success_detail", "error_detail"}.
+    A partially converted PDF has both a success_detail and an error_detail.
+    """
+    record = {"pdf_file": pdf_file, "processed": False, "images_created": 0, "messages": [],
+              "success_detail": None, "error_detail": None}
+    current_output_subdir = os.path.join(output_dir, os.path.splitext(pdf_file)[0])
+
+    failed = next((part for part in parts if part["error"]), None)
+    if failed is not None:
+        module_logger.error(failed["error"])
+        record["processed"] = not failed["unprocessed"]
+        record["messages"].append(f"[ERROR] {failed['error']}")
+        record["error_detail"] = {"pdf_file": pdf_file, "error": failed["error"]}
+        return record
+
+    record["processed"] = True
+    pages_ok = sum(part["pages_ok"] for part in parts)
+    pages_failed = sum(part["pages_failed"] for part in parts)
+    first_page_error = next((part["first_error"] for part in parts if part["first_error"]), None)
+
+    if pages_failed == 0 and pages_ok > 0:
+        msg = f"Successfully converted '{pdf_file}' to {pages_ok} images in '{current_output_subdir}'."
+        module_logger.info(msg)
+        record["messages"].append(f"[SUCCESS] {msg}")
+        record["success_detail"] = {"pdf_file": pdf_file, "output_folder": current_output_subdir, "images_created": pages_ok}
+        record["images_created"] = pages_ok
+    elif pages_ok == 0 and pages_failed > 0: # All pages failed
+        msg = f"All pages failed to convert for '{pdf_file}' (first error at {first_page_error})."
+        module_logger.error(msg)
+        record["messages"].append(f"[ERROR] {msg}")
+        record["error_detail"] = {"pdf_file": pdf_file, "error": "All pages failed conversion."}
+    elif pages_failed > 0: # Partial success, counted as a file-level error
+        msg = (f"Partially converted '{pdf_file}': {pages_ok} succeeded, {pages_failed} failed "
+               f"(first error at {first_page_error}). Output in '{current_output_subdir}'.")
+        module_logger.warning(msg)
+        record["messages"].append(f"[WARN] {msg}")
+        record["success_detail"] = {"pdf_file": pdf_file, "output_folder": current_output_subdir, "images_created": pages_ok}
+        record["error_detail"] = {"pdf_file": pdf_file, "error": f"{pages_failed} pages failed conversion."}
+        record["images_created"] = pages_ok
+    return record
+
+def pdf_to_images_api(input_dir: str, output_dir: str, fmt: str = 'png', dpi: int = 300, quality: int = 90,
+                      max_workers: int = None) -> dict:
     """
     API-adapted: PDF to Image function.
     Args:
@@ -206,19 +363,18 @@ def pdf_to_images_api(input_dir: str, output_dir: str, fmt: str = 'png', dpi: in
         fmt (str): Output format ('png' or 'jpg').
         dpi (int): Output resolution.
         quality (int): Quality for JPG output (0-100).
+        max_workers (int, optional): Max worker processes. Defaults to min(CPU count, 8). With fewer PDFs than
+            workers, PDFs are split into page ranges rendered by separate workers.
     Returns:
         dict: Operation results.
     """
-    module_logger.info(f"API: Starting PDF to {fmt.upper()} conversion from '{input_dir}' to '{output_dir}'. DPI: {dpi}, Quality: {quality if fmt.lower()=='jpg' else 'N/A'}")
+    fmt_lower = fmt.lower()
+    is_jpg = fmt_lower == 'jpg'
+
+    module_logger.info(f"API: Starting PDF to {fmt.upper()} conversion from '{input_dir}' to '{output_dir}'. DPI: {dpi}, Quality: {quality if is_jpg else 'N/A'}")
     messages = []
-    success_conversion_details = [] # List of {"pdf_file": "...", "output_folder": "...", "images_created": count}
-    error_conversion_details = []   # List of {"pdf_file": "...", "error": "..."}
-    total_pdfs_processed = 0
-    total_images_created = 0
-    error_count = 0
-    overall_success = True
 
-    if fmt.lower() not in ['png', 'jpg']:
+    if fmt_lower not in ['png', 'jpg']:
         msg = "Invalid image format. Must be 'png' or 'jpg'."
         module_logger.error(msg)
         return {"success": False, "messages": [f"[ERROR] {msg}"], "error_count": 1}
@@ -226,7 +382,7 @@ def pdf_to_images_api(input_dir: str, output_dir: str, fmt: str = 'png', dpi: in
         msg = "Invalid DPI value. Must be between 1 and 1200."
         module_logger.error(msg)
         return {"success": False, "messages": [f"[ERROR] {msg}"], "error_count": 1}
-    if fmt.lower() == 'jpg' and not (0 <= quality <= 100):
+    if is_jpg and not (0 <= quality <= 100):
         msg = "Invalid quality value for JPG. Must be between 0 and 100."
         module_logger.error(msg)
         return {"success": False, "messages": [f"[ERROR] {msg}"], "error_count": 1}
@@ -238,7 +394,7 @@ def pdf_to_images_api(input_dir: str, output_dir: str, fmt: str = 'png', dpi: in
         return {"success": False, "messages": [f"[ERROR] {msg}"], "error_count": 1}
 
     try:
-        pdf_files = [f for f in os.listdir(input_dir) if f.lower().endswith('.pdf')]
+        pdf_files = _list_files_with_suffix(input_dir, '.pdf')
     except Exception as e:
         msg = f"Could not read input directory '{input_dir}': {e}"
         module_logger.error(msg)
@@ -258,80 +414,24 @@ def pdf_to_images_api(input_dir: str, output_dir: str, fmt: str = 'png', dpi: in
         module_logger.error(msg)
         return {"success": False, "messages": [f"[ERROR] {msg}"], "error_count": 1}
 
-    total_pdfs_to_process = len(pdf_files)
-
-    for pdf_file in tqdm(pdf_files, desc="API PDF to Image", unit="pdf", disable=True):
-        input_path = os.path.join(input_dir, pdf_file)
-        pdf_base_name = os.path.splitext(pdf_file)[0]
-        # Each PDF gets its own subfolder in the output_dir
-        current_output_subdir = os.path.join(output_dir, pdf_base_name)
-        
-        try:
-            os.makedirs(current_output_subdir, exist_ok=True)
-        except Exception as e_mkdir:
-            msg = f"Could not create subdirectory '{current_output_subdir}' for '{pdf_file}': {e_mkdir}"
-            module_logger.error(msg)
-            messages.append(f"[ERROR] {msg}")
-            error_conversion_details.append({"pdf_file": pdf_file, "error": msg})
-            error_count += 1
-            overall_success = False
-            continue # Skip this PDF
-
-        total_pdfs_processed +=1
-        page_conversion_success_count = 0
-        page_conversion_error_count = 0
-        
-        try:
-            doc = fitz.open(input_path)
-            for i, page in enumerate(doc):
-                pix = page.get_pixmap(dpi=dpi)
-                image_filename = f"{pdf_base_name}_page_{i+1:03d}.{fmt.lower()}"
-                image_output_path = os.path.join(current_output_subdir, image_filename)
-                
-                try:
-                    if fmt.lower() == 'jpg':
-                        img_pil = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                        img_pil.save(image_output_path, quality=quality, optimize=True, progressive=True)
-                    else: # PNG
-                        pix.save(image_output_path)
-                    page_conversion_success_count += 1
-                except Exception as e_save:
-                    page_conversion_error_count +=1
-                    module_logger.error(f"Error saving page {i+1} of '{pdf_file}' as '{image_filename}': {e_save}")
-                    messages.append(f"[ERROR] Saving page {i+1} of '{pdf_file}': {e_save}")
-            doc.close()
-
-            if page_conversion_error_count == 0 and page_conversion_success_count > 0:
-                msg = f"Successfully converted '{pdf_file}' to {page_conversion_success_count} images in '{current_output_subdir}'."
-                module_logger.info(msg)
-                messages.append(f"[SUCCESS] {msg}")
-                success_conversion_details.append({"pdf_file": pdf_file, "output_folder": current_output_subdir, "images_created": page_conversion_success_count})
-                total_images_created += page_conversion_success_count
-            elif page_conversion_success_count == 0 and page_conversion_error_count > 0 : # All pages failed
-                 msg = f"All pages failed to convert for '{pdf_file}'."
-                 module_logger.error(msg)
-                 messages.append(f"[ERROR] {msg}")
-                 error_conversion_details.append({"pdf_file": pdf_file, "error": "All pages failed conversion."})
-                 error_count += 1
-                 overall_success = False
-            elif page_conversion_error_count > 0: # Partial success
-                msg = f"Partially converted '{pdf_file}': {page_conversion_success_count} succeeded, {page_conversion_error_count} failed. Output in '{current_output_subdir}'."
-                module_logger.warning(msg)
-                messages.append(f"[WARN] {msg}")
-                success_conversion_details.append({"pdf_file": pdf_file, "output_folder": current_output_subdir, "images_created": page_conversion_success_count})
-                error_conversion_details.append({"pdf_file": pdf_file, "error": f"{page_conversion_error_count} pages failed conversion."})
-                total_images_created += page_conversion_success_count
-                error_count +=1 # Count as a file-level error if any page fails
-                overall_success = False
-
-
-        except Exception as e_open:
-            msg = f"Failed to open or process PDF '{pdf_file}': {type(e_open).__name__} - {str(e_open).splitlines()[0]}"
-            module_logger.error(msg)
-            messages.append(f"[ERROR] {msg}")
-            error_conversion_details.append({"pdf_file": pdf_file, "error": msg})
-            error_count += 1
-            overall_success = False
+    workers = max_workers or _DEFAULT_MAX_WORKERS
+    if len(pdf_files) < workers:
+        page_ranges = _split_pdf_page_ranges(pdf_files, input_dir, workers)
+    else:
+        page_ranges = [(pdf_file, 0, None) for pdf_file in pdf_files]
+    jobs = [(pdf_file, input_dir, output_dir, is_jpg, dpi, quality, first_page, stop_page)
+            for pdf_file, first_page, stop_page in page_ranges]
+    parts_by_pdf = {pdf_file: [] for pdf_file in pdf_files}
+    for part in run_jobs(_pdf_to_images_one, jobs, workers, failure_record=_failed_range_record):
+        parts_by_pdf[part["pdf_file"]].append(part) # Job order keeps each PDF's ranges in page order
+    results = [_summarize_pdf_pages(pdf_file, output_dir, parts) for pdf_file, parts in parts_by_pdf.items()]
+    for r in results:
+        messages.extend(r["messages"])
+    success_conversion_details = [r["success_detail"] for r in results if r["success_detail"]]
+    error_conversion_details = [r["error_detail"] for r in results if r["error_detail"]]
+    total_pdfs_processed = sum(r["processed"] for r in results)
+    total_images_created = sum(r["images_created"] for r in results)
+    error_count = len(error_conversion_details)
 
     final_summary_msg = (f"PDF to Image conversion finished. Total PDFs processed: {total_pdfs_processed}, "
                          f"Total images created: {total_images_created}, PDFs with errors: {error_count}.")
@@ -339,7 +439,7 @@ def pdf_to_images_api(input_dir: str, output_dir: str, fmt: str = 'png', dpi: in
     messages.append(f"[INFO] {final_summary_msg}")
 
     return {
-        "success": overall_success and error_count == 0,
+        "success": error_count == 0,
         "messages": messages,
         "total_pdfs_processed": total_pdfs_processed,
         "total_images_created": total_images_created,
@@ -378,7 +478,7 @@ def images_to_pdf_api(input_dir: str, output_dir: str, output_pdf_filename: str
 
     try:
         image_files = sorted(
-            [f for f in os.listdir(input_dir) if f.lower().endswith(SUPPORTED_IMAGE_EXTENSIONS)],
+            _list_files_with_suffix(input_dir, SUPPORTED_IMAGE_EXTENSIONS),
             key=natural_sort_key
         )
     except Exception as e:
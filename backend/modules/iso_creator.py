@@ -3,71 +3,134 @@ import os
 import subprocess
 import sys
 import shutil
-import re
 import logging
 import time
-from tqdm import tqdm
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 module_logger = logging.getLogger(__name__)
 
-def _create_iso_from_folder_hdiutil(source_folder: str, output_dir: str) -> tuple[bool, str, str]:
+# Single source of truth for the platform gate
+_IS_DARWIN = sys.platform == "darwin"
+# Resolved once at import: shutil.which walks $PATH with a stat per candidate directory.
+# None means hdiutil cannot be used, either because this is not macOS or because it is missing.
+_HDIUTIL_PATH = shutil.which("hdiutil") if _IS_DARWIN else None
+
+_existing_isos_lock = threading.Lock() # Guards the shared existing_isos sets used by concurrent jobs
+
+# Characters that are problematic in filenames or paths for ISOs, each mapped to '_'
+_INVALID_ISO_NAME_CHARS = str.maketrans(dict.fromkeys('\\/:*?"<>|()&;\'', '_'))
+
+def _list_existing_isos(output_dir: str) -> set | None:
+    """
+    Internal helper: Names of the .iso files already in output_dir, read with a single scandir.
+    Returns an empty set if the directory does not exist yet, or None if it cannot be read
+    (callers then fall back to checking each ISO path individually).
+    """
+    try:
+        with os.scandir(output_dir) as it:
+            return {e.name for e in it if e.name.endswith('.iso')}
+    except FileNotFoundError:
+        return set()
+    except OSError as e:
+        module_logger.warning(f"Could not scan '{output_dir}' for existing ISOs: {e}")
+        return None
+
+def _create_iso_from_folder_hdiutil(source_folder: str, output_dir: str, existing_isos: set = None,
+                                    ensure_output_dir: bool = True, folder_name: str = None) -> tuple[bool, str, str]:
     """
     Internal helper: Uses hdiutil (macOS only) to create an ISO.
+    If existing_isos (names of ISOs already in output_dir) is given, it is used instead of
+    probing the filesystem for the target ISO, and the new ISO name is claimed in it so a
+    same-named subfolder from another parent directory is skipped rather than clobbering it.
+    Batch callers that already created output_dir pass ensure_output_dir=False, and may pass the
+    folder_name they already know from scandir instead of having it derived from source_folder.
     Returns: (success_flag, message_or_path, iso_filename_or_error_detail)
     """
-    if sys.platform != "darwin":
-        return False, "ISO creation with hdiutil is supported only on macOS.", ""
-
-    if shutil.which("hdiutil") is None:
+    if _HDIUTIL_PATH is None:
+        if not _IS_DARWIN:
+            return False, "ISO creation with hdiutil is supported only on macOS.", ""
         return False, "'hdiutil' command not found. Please ensure it's installed on your macOS system.", ""
 
-    folder_name = os.path.basename(source_folder)
-    # Replace characters that are problematic in filenames or paths for ISOs
-    cleaned_name = re.sub(r'[\\/:*?"<>|()&;\']', '_', folder_name.strip())
+    if folder_name is None:
+        folder_name = os.path.basename(source_folder)
+    cleaned_name = folder_name.strip().translate(_INVALID_ISO_NAME_CHARS)
     if not cleaned_name: # Handle case where folder_name consisted only of special chars
         cleaned_name = "iso_image"
     iso_filename = f"{cleaned_name}.iso"
     output_iso_path = os.path.join(output_dir, iso_filename)
 
-    if os.path.exists(output_iso_path):
+    if existing_isos is None:
+        already_exists = os.path.exists(output_iso_path)
+    else:
+        with _existing_isos_lock:
+            already_exists = iso_filename in existing_isos
+            existing_isos.add(iso_filename)
+    if already_exists:
         return True, f"Skipping: Target ISO file already exists: {output_iso_path}", iso_filename
 
-    try:
-        os.makedirs(output_dir, exist_ok=True)
-    except Exception as e:
-        return False, f"Could not create output directory '{output_dir}': {e}", ""
+    iso_result = _run_hdiutil_makehybrid(source_folder, output_dir, output_iso_path, iso_filename, ensure_output_dir)
+    if not iso_result[0] and existing_isos is not None:
+        with _existing_isos_lock:
+            existing_isos.discard(iso_filename) # Release the claim so a same-named folder can still try
+    return iso_result
+
+def _run_hdiutil_makehybrid(source_folder: str, output_dir: str, output_iso_path: str, iso_filename: str,
+                            ensure_output_dir: bool = True) -> tuple[bool, str, str]:
+    """
+    Internal helper: Runs 'hdiutil makehybrid' for one folder.
+    Returns: (success_flag, message_or_path, iso_filename_or_error_detail)
+    """
+    if ensure_output_dir:
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+        except OSError as e:
+            return False, f"Could not create output directory '{output_dir}': {e}", ""
     
     module_logger.info(f"Compressing with hdiutil: '{source_folder}' -> '{output_iso_path}'")
-    cmd = ["hdiutil", "makehybrid", "-o", output_iso_path, source_folder, "-iso", "-joliet"]
+    cmd = [_HDIUTIL_PATH, "makehybrid", "-o", output_iso_path, source_folder, "-iso", "-joliet"]
 
     try:
-        # Using a timeout for external processes is a good practice
-        process = subprocess.run(cmd, check=True, capture_output=True, text=True, encoding='utf-8', timeout=300) # 5 min timeout
+        # Using a timeout for external processes is a good practice.
+        # stdout is never used, so discard it; stderr stays raw bytes and is only decoded on failure.
+        # An absolute executable, no preexec_fn/cwd/env and close_fds=False let CPython launch hdiutil
+        # with posix_spawn instead of fork+exec, avoiding copying this process's page tables per job.
+        # Python's own descriptors are non-inheritable (PEP 446), so nothing leaks into the child.
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                       close_fds=False, timeout=300) # 5 min timeout
         module_logger.info(f"Successfully created ISO file: {output_iso_path}")
         return True, output_iso_path, iso_filename
     except subprocess.CalledProcessError as e:
-        error_msg = f"hdiutil failed. Code: {e.returncode}. Stdout: {e.stdout.strip()}. Stderr: {e.stderr.strip()}"
+        stderr_text = e.stderr.decode('utf-8', errors='replace').strip() if e.stderr else ""
+        error_msg = f"hdiutil failed. Code: {e.returncode}. Stderr: {stderr_text}"
         module_logger.error(error_msg)
         return False, error_msg, ""
     except subprocess.TimeoutExpired:
         error_msg = f"hdiutil command timed out for folder: {source_folder}"
         module_logger.error(error_msg)
         return False, error_msg, ""
-    except FileNotFoundError: # Should be caught by shutil.which earlier, but as a safeguard
+    except FileNotFoundError: # Should be caught by the _HDIUTIL_PATH check earlier, but as a safeguard (e.g. hdiutil removed since import)
         error_msg = "'hdiutil' command not found."
         module_logger.error(error_msg)
         return False, error_msg, ""
-    except Exception as e:
+    except (OSError, subprocess.SubprocessError) as e: # Anything else is a bug and propagates
         error_msg = f"An unknown error occurred during ISO creation with hdiutil: {e}"
         module_logger.error(error_msg)
         return False, error_msg, ""
 
-def process_subfolders_to_iso_api(parent_dirs_list: list, output_base_dir: str = None) -> dict:
+def process_subfolders_to_iso_api(parent_dirs_list: list, output_base_dir: str = None, max_workers: int = None,
+                                  progress_callback: Callable[[int, int], None] = None, verbose: bool = False) -> dict:
     """
     API-adapted: Batch processes subfolders to create ISO files.
     Args:
         parent_dirs_list (list): List of parent directory paths.
         output_base_dir (str, optional): Base output directory. If None, ISOs are saved in parent_dirs.
+        max_workers (int, optional): Max concurrent hdiutil jobs. Defaults to the CPU count;
+            lower it when the disk rather than the CPU is the bottleneck.
+        progress_callback (callable, optional): Called as progress_callback(done, total) after each ISO job finishes.
+        verbose (bool): Also add a [SUCCESS]/[SKIP] message per subfolder. Errors and the summary are always
+            reported; per-ISO results are available in the detail lists either way.
     Returns:
         dict: Operation results.
     """
@@ -84,7 +147,7 @@ def process_subfolders_to_iso_api(parent_dirs_list: list, output_base_dir: str =
     overall_success = True # Becomes False if any critical error occurs
 
     # Platform check for the core ISO creation method
-    if sys.platform != "darwin":
+    if not _IS_DARWIN:
         msg = "ISO creation using the current method (hdiutil) is only supported on macOS."
         module_logger.error(msg)
         messages.append(f"[ERROR] {msg}")
@@ -97,8 +160,35 @@ def process_subfolders_to_iso_api(parent_dirs_list: list, output_base_dir: str =
         module_logger.error(msg)
         return {"success": False, "messages": [f"[ERROR] {msg}"], "error_count": 1}
 
+    # Validate every parent directory first and collect one flat list of ISO jobs, so a single
+    # pool serves all parents and fast jobs from one parent overlap with slow ones from another.
+    iso_jobs_to_run = [] # (source_folder, subfolder_name, output_dir, existing_isos)
+    existing_isos_by_dir = {} # output dir -> names of ISOs already there, scanned once per dir
     for parent_dir in parent_dirs_list:
-        if not isinstance(parent_dir, str) or not os.path.isdir(parent_dir):
+        # A single scandir both validates parent_dir and enumerates it. DirEntry.is_dir() answers
+        # from the readdir d_type, so no extra stat per entry (only symlinks are stat'ed, keeping
+        # the old follow-symlink behaviour).
+        subfolders = None
+        list_error = None
+        if isinstance(parent_dir, str):
+            try:
+                with os.scandir(parent_dir) as it:
+                    subfolders = [e for e in it if e.is_dir()]
+            except (FileNotFoundError, NotADirectoryError):
+                pass # Reported as an invalid directory below
+            except OSError as e:
+                list_error = e
+
+        if list_error is not None:
+            msg = f"Could not list subfolders in '{parent_dir}': {list_error}"
+            module_logger.error(msg)
+            messages.append(f"[ERROR] {msg}")
+            error_isos_details.append({"source_folder": parent_dir, "error": f"Failed to list subfolders: {list_error}"})
+            error_count += 1
+            overall_success = False
+            continue
+
+        if subfolders is None:
             msg = f"Skipping invalid parent directory: '{parent_dir}'"
             module_logger.warning(msg)
             messages.append(f"[WARN] {msg}")
@@ -109,17 +199,6 @@ def process_subfolders_to_iso_api(parent_dirs_list: list, output_base_dir: str =
 
         actual_output_dir = output_base_dir if output_base_dir else parent_dir
         module_logger.info(f"Processing subfolders in '{parent_dir}', outputting to '{actual_output_dir}'")
-        
-        try:
-            subfolders = [f for f in os.listdir(parent_dir) if os.path.isdir(os.path.join(parent_dir, f))]
-        except Exception as e:
-            msg = f"Could not list subfolders in '{parent_dir}': {e}"
-            module_logger.error(msg)
-            messages.append(f"[ERROR] {msg}")
-            error_isos_details.append({"source_folder": parent_dir, "error": f"Failed to list subfolders: {e}"})
-            error_count += 1
-            overall_success = False
-            continue
 
         if not subfolders:
             msg = f"No subfolders found in '{parent_dir}'."
@@ -127,31 +206,65 @@ def process_subfolders_to_iso_api(parent_dirs_list: list, output_base_dir: str =
             messages.append(f"[INFO] {msg}")
             continue
 
+        if actual_output_dir not in existing_isos_by_dir:
+            # Create each output directory once here instead of once per ISO in the helper
+            try:
+                os.makedirs(actual_output_dir, exist_ok=True)
+            except OSError as e:
+                msg = f"Could not create output directory '{actual_output_dir}' for '{parent_dir}': {e}"
+                module_logger.error(msg)
+                messages.append(f"[ERROR] {msg}")
+                error_isos_details.append({"source_folder": parent_dir, "error": msg})
+                error_count += 1
+                overall_success = False
+                continue
+            existing_isos_by_dir[actual_output_dir] = _list_existing_isos(actual_output_dir)
+
         total_subfolders_found += len(subfolders)
+        existing_isos = existing_isos_by_dir[actual_output_dir]
 
-        for subfolder_name in tqdm(subfolders, desc=f"Creating ISOs from {os.path.basename(parent_dir)}", unit="folder", disable=True):
-            full_subfolder_path = os.path.join(parent_dir, subfolder_name)
-            
+        iso_jobs_to_run.extend((e.path, e.name, actual_output_dir, existing_isos) for e in subfolders)
+
+    # hdiutil does the heavy lifting in its own process, so threads are enough to keep
+    # several jobs in flight.
+    if iso_jobs_to_run:
+        workers = min(max_workers or os.cpu_count() or 1, len(iso_jobs_to_run))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
             # Using the macOS specific hdiutil function
-            iso_success, result_msg_or_path, iso_name = _create_iso_from_folder_hdiutil(full_subfolder_path, actual_output_dir)
-            
-            if iso_success:
-                if "Skipping" in result_msg_or_path:
-                    module_logger.info(result_msg_or_path)
-                    messages.append(f"[SKIP] {result_msg_or_path}")
-                    skipped_isos_details.append({"source_folder": subfolder_name, "reason": result_msg_or_path, "iso_name": iso_name})
-                    skipped_count += 1
-                else: # Actual success creating a new ISO
-                    module_logger.info(f"Successfully created ISO: {iso_name} from {subfolder_name}")
-                    messages.append(f"[SUCCESS] Created ISO: {iso_name} from {subfolder_name}")
-                    success_isos_details.append({"source_folder": subfolder_name, "iso_path": result_msg_or_path, "iso_name": iso_name})
-                    success_count += 1
-            else: # Failure
-                module_logger.error(f"Failed to create ISO for '{subfolder_name}': {result_msg_or_path}")
-                messages.append(f"[ERROR] ISO creation failed for '{subfolder_name}': {result_msg_or_path}")
-                error_isos_details.append({"source_folder": subfolder_name, "error": result_msg_or_path})
-                error_count += 1
-                overall_success = False
+            iso_jobs = {
+                executor.submit(_create_iso_from_folder_hdiutil, source_folder, output_dir, existing_isos,
+                                ensure_output_dir=False, folder_name=subfolder_name): subfolder_name
+                for source_folder, subfolder_name, output_dir, existing_isos in iso_jobs_to_run
+            } # future -> subfolder_name
+
+            total_jobs = len(iso_jobs)
+            for jobs_done, future in enumerate(as_completed(iso_jobs), 1):
+                subfolder_name = iso_jobs[future]
+                # The helper turns every expected failure into a result tuple; anything it raises is a bug
+                iso_success, result_msg_or_path, iso_name = future.result()
+
+                if iso_success:
+                    if "Skipping" in result_msg_or_path:
+                        module_logger.info(result_msg_or_path)
+                        if verbose:
+                            messages.append(f"[SKIP] {result_msg_or_path}")
+                        skipped_isos_details.append({"source_folder": subfolder_name, "reason": result_msg_or_path, "iso_name": iso_name})
+                        skipped_count += 1
+                    else: # Actual success creating a new ISO
+                        module_logger.info(f"Successfully created ISO: {iso_name} from {subfolder_name}")
+                        if verbose:
+                            messages.append(f"[SUCCESS] Created ISO: {iso_name} from {subfolder_name}")
+                        success_isos_details.append({"source_folder": subfolder_name, "iso_path": result_msg_or_path, "iso_name": iso_name})
+                        success_count += 1
+                else: # Failure
+                    module_logger.error(f"Failed to create ISO for '{subfolder_name}': {result_msg_or_path}")
+                    messages.append(f"[ERROR] ISO creation failed for '{subfolder_name}': {result_msg_or_path}")
+                    error_isos_details.append({"source_folder": subfolder_name, "error": result_msg_or_path})
+                    error_count += 1
+                    overall_success = False
+
+                if progress_callback is not None:
+                    progress_callback(jobs_done, total_jobs)
     
     final_summary_msg = (f"ISO creation process finished. Subfolders found: {total_subfolders_found}, "
                          f"Successfully created: {success_count}, Skipped: {skipped_count}, Failed: {error_count}.")
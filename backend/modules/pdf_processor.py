@@ -1,16 +1,179 @@
 # backend/modules/pdf_processor.py
 import os
+import sys
 import time
 import logging
 import shutil
+import tempfile
+from bisect import bisect_left
+from itertools import groupby
 from pathlib import Path
 import fitz # PyMuPDF
 import pikepdf
-from tqdm import tqdm
+from ._parallel import run_jobs
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
 
 module_logger = logging.getLogger(__name__)
 
-def remove_pdf_pages_api(input_dir: str, output_dir: str, trim_type: str = 'f', num_pages: int = 1) -> dict:
+# PyMuPDF/pikepdf work is CPU-bound, so files are spread over worker processes (fitz) or
+# threads (pikepdf, whose QPDF core does the heavy lifting outside Python bytecode)
+_DEFAULT_MAX_WORKERS = min(os.cpu_count() or 1, 8)
+
+# Linux FICLONE ioctl (copy-on-write clone on Btrfs/XFS); exposed by fcntl only from Python 3.12.
+# The fallback number is Linux's; on other POSIX systems it means a different ioctl, so skip it there.
+_FICLONE = getattr(fcntl, "FICLONE", 0x40049409) if fcntl is not None and sys.platform.startswith('linux') else None
+
+# Page cache hints (Linux/BSD); None where posix_fadvise is unavailable (macOS, Windows)
+_FADV_WILLNEED = getattr(os, "POSIX_FADV_WILLNEED", None)
+_FADV_DONTNEED = getattr(os, "POSIX_FADV_DONTNEED", None)
+
+# Optional scratch directory for repair temp files (e.g. /dev/shm), so only the final move touches output_dir
+_PDF_TMP_DIR = os.environ.get("PDF_TMP_DIR") or None
+
+def _list_pdf_files(input_dir: str) -> list:
+    """
+    Internal helper: Names of regular .pdf files in input_dir, skipping directories and
+    the '~'-prefixed temp files this module writes. Raises OSError if the directory can't be read.
+    """
+    with os.scandir(input_dir) as it:
+        return [e.name for e in it
+                if e.name.lower().endswith('.pdf') and not e.name.startswith('~') and e.is_file()]
+
+
+def _advise_page_cache(path: Path, advice: int) -> None:
+    """
+    Internal helper: Best-effort posix_fadvise over the whole file. WILLNEED on an input starts readahead
+    before the PDF library parses it; DONTNEED on a finished output starts writeback and lets its pages be
+    dropped, so long batches don't push the next inputs out of the page cache. No-op if advice is None.
+    """
+    if advice is None:
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, advice)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass # Only a hint
+
+
+def _quick_pdf_triage(path: Path):
+    """
+    Internal helper: Cheap check before handing a file to a PDF parser, which otherwise scans the whole
+    file trying to recover it. Returns None if the file looks like a PDF, else a short reason.
+    Only rejects what no PDF library opens (empty file, no %PDF- header in the first 1024 bytes); a missing
+    %%EOF or an /Encrypt entry is left to the parser, since repair fixes the former and PDFs with only an
+    owner password still open.
+    """
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(1024)
+    except OSError as e:
+        return f"unreadable ({e.strerror})"
+    if not head:
+        return "empty file"
+    if b"%PDF-" not in head:
+        return "not a PDF (no %PDF- header)"
+    return None
+
+
+def _trim_keep_slice(trim_type: str, num_pages: int) -> slice:
+    """Internal helper: The slice of page indices a trim keeps, built once per batch from validated arguments."""
+    if trim_type == 'f':
+        return slice(num_pages, None) # Drop the first num_pages
+    if trim_type == 'l':
+        return slice(None, -num_pages or None) # Drop the last num_pages ('or None': -0 would keep nothing)
+    return slice(1, -1) # 'lf': drop the first and the last page
+
+def _process_one_trim(pdf_file: str, in_dir: Path, out_dir: Path, keep: slice,
+                      linearize: bool = False, garbage_level: int = 3) -> dict:
+    """
+    Internal helper (process pool worker): Trims pages from the beginning/end of one PDF.
+    keep is the slice of page indices to keep, from _trim_keep_slice.
+    Returns a result record: {"file", "ok", "messages", "detail", "error"}.
+    """
+    input_path = in_dir / pdf_file
+    output_path = out_dir / pdf_file # Output has the same name in the output_dir
+    # MuPDF only saves over the file a document was opened from incrementally, so an in-place trim
+    # (output_dir == input_dir) is written to a temp file and replaces the original once it is closed
+    in_place = input_path.resolve() == output_path.resolve()
+    save_path = out_dir / f"~temp_trimmed_{pdf_file}" if in_place else output_path
+    messages = []
+    original_page_count = 0
+    new_page_count = 0
+
+    triage_error = _quick_pdf_triage(input_path)
+    if triage_error:
+        msg = f"Page trimming failed for '{pdf_file}': {triage_error}"
+        module_logger.error(msg)
+        messages.append(f"[ERROR] {msg}")
+        return {"file": pdf_file, "ok": False, "messages": messages, "detail": None, "error": msg}
+
+    try:
+        _advise_page_cache(input_path, _FADV_WILLNEED)
+        with fitz.open(input_path) as src_doc:
+            original_page_count = len(src_doc)
+            if original_page_count == 0:
+                msg = f"Skipping '{pdf_file}': PDF has no pages."
+                module_logger.warning(msg)
+                messages.append(f"[WARN] {msg}")
+                return {"file": pdf_file, "ok": False, "messages": messages, "detail": None, "error": "PDF has no pages"}
+
+            kept = range(original_page_count)[keep] # O(1): slicing a range yields a range
+
+            if not kept: # All pages are trimmed
+                msg = f"All pages trimmed for '{pdf_file}'. Original: {original_page_count} pages."
+                module_logger.info(msg)
+                # Save an empty PDF or a PDF with one blank page?
+                # For now, saving an empty PDF if all pages are trimmed.
+                with fitz.open() as new_doc:
+                    new_doc.set_metadata(src_doc.metadata)
+                    new_doc.save(save_path, garbage=garbage_level, deflate=True, clean=True)
+                new_page_count = 0
+            else:
+                # Delete the trimmed pages from the opened document and save it under the output path, rather
+                # than rebuilding a new document. Metadata is kept as is, and MuPDF re-points the outline
+                # (entries for deleted pages lose their destination), so no manual metadata/ToC copy is needed.
+                # The kept pages are contiguous, so at most two range deletions: the tail first, so the head's
+                # indices are still valid afterwards.
+                if kept.stop < original_page_count:
+                    src_doc.delete_pages(kept.stop, original_page_count - 1)
+                if kept.start > 0:
+                    src_doc.delete_pages(0, kept.start - 1)
+                src_doc.save(save_path, garbage=garbage_level, deflate=True, clean=True, no_new_id=True, linear=linearize)
+                new_page_count = len(src_doc)
+        if in_place:
+            os.replace(save_path, output_path)
+        _advise_page_cache(output_path, _FADV_DONTNEED)
+
+        msg = f"Page trimming successful for '{pdf_file}'. Original: {original_page_count}, New: {new_page_count}. Saved to '{output_path}'"
+        module_logger.info(msg)
+        messages.append(f"[SUCCESS] {msg}")
+        detail = {
+            "original": pdf_file, 
+            "processed": output_path.name, 
+            "original_pages": original_page_count, 
+            "new_pages": new_page_count
+        }
+        return {"file": pdf_file, "ok": True, "messages": messages, "detail": detail, "error": None}
+
+    except Exception as e: # Arguments are validated by remove_pdf_pages_api, so anything here comes from the file itself
+        error_msg = str(e).split('\n')[0]
+        msg = f"Page trimming failed for '{pdf_file}': {type(e).__name__} - {error_msg}"
+        module_logger.error(msg, exc_info=False)
+        messages.append(f"[ERROR] {msg}")
+        try: save_path.unlink(missing_ok=True) # Clean up the partial output (the temp file when trimming in place)
+        except OSError: pass
+        return {"file": pdf_file, "ok": False, "messages": messages, "detail": None, "error": msg}
+
+
+def remove_pdf_pages_api(input_dir: str, output_dir: str, trim_type: str = 'f', num_pages: int = 1, max_workers: int = None,
+                         linearize: bool = False, garbage_level: int = 3, verbose: bool = False) -> dict:
     """
     API-adapted: PDF Page Cropping Function.
     Removes pages from the beginning or end of PDF files by rebuilding the document structure.
@@ -19,17 +182,18 @@ def remove_pdf_pages_api(input_dir: str, output_dir: str, trim_type: str = 'f',
         output_dir (str): The directory where the processed PDF files will be saved.
         trim_type (str): Type of trimming ('f', 'l', 'lf').
         num_pages (int): Number of pages to trim.
+        max_workers (int, optional): Max worker processes. Defaults to min(CPU count, 8).
+        linearize (bool): Write linearized ("fast web view") PDFs. Costs an extra pass over every document,
+            so it is off unless the output will be served over HTTP range requests.
+        garbage_level (int): PyMuPDF garbage collection level (0-4). 3 drops unused objects and compacts the
+            xref; 4 additionally de-duplicates streams, which re-hashes every stream.
+        verbose (bool): Also add a [SUCCESS] message per PDF. Errors, warnings and the summary are always
+            reported; per-file results are in success_files/error_files either way.
     Returns:
         dict: Operation results.
     """
     module_logger.info(f"API: Starting PDF page trimming (type: {trim_type}, pages: {num_pages}) from '{input_dir}' to '{output_dir}'.")
     messages = []
-    success_files_details = []  # List of {"original": "file.pdf", "processed": "file.pdf", "original_pages": X, "new_pages": Y}
-    error_files_details = []    # List of {"file": "file.pdf", "error": "error message"}
-    processed_count = 0 # Counts files attempted
-    success_count = 0
-    error_count = 0
-    overall_success = True
 
     valid_trim_types = ['f', 'l', 'lf']
     if trim_type not in valid_trim_types:
@@ -42,6 +206,11 @@ def remove_pdf_pages_api(input_dir: str, output_dir: str, trim_type: str = 'f',
         module_logger.error(msg)
         return {"success": False, "messages": [f"[ERROR] {msg}"], "processed_count": 0, "success_count": 0, "error_count": 1}
 
+    if garbage_level not in range(5):
+        msg = f"Invalid garbage_level: '{garbage_level}'. Must be an integer from 0 to 4."
+        module_logger.error(msg)
+        return {"success": False, "messages": [f"[ERROR] {msg}"], "processed_count": 0, "success_count": 0, "error_count": 1}
+
 
     if not os.path.isdir(input_dir):
         msg = f"Input directory '{input_dir}' does not exist."
@@ -49,8 +218,8 @@ def remove_pdf_pages_api(input_dir: str, output_dir: str, trim_type: str = 'f',
         return {"success": False, "messages": [f"[ERROR] {msg}"], "processed_count": 0, "success_count": 0, "error_count": 1}
 
     try:
-        pdf_files = [f for f in os.listdir(input_dir) if f.lower().endswith('.pdf')]
-    except Exception as e:
+        pdf_files = _list_pdf_files(input_dir)
+    except OSError as e:
         msg = f"Could not read input directory '{input_dir}': {e}"
         module_logger.error(msg)
         return {"success": False, "messages": [f"[ERROR] {msg}"], "processed_count": 0, "success_count": 0, "error_count": 1}
@@ -70,120 +239,23 @@ def remove_pdf_pages_api(input_dir: str, output_dir: str, trim_type: str = 'f',
 
     total_files_to_process = len(pdf_files)
 
-    for pdf_file in tqdm(pdf_files, desc="API PDF Page Trimming", unit="file", disable=True):
-        input_path = os.path.join(input_dir, pdf_file)
-        output_path = os.path.join(output_dir, pdf_file) # Output has the same name in the output_dir
-        processed_count +=1
-        original_page_count = 0
-        new_page_count = 0
-
-        try:
-            with fitz.open(input_path) as src_doc:
-                original_page_count = len(src_doc)
-                if original_page_count == 0:
-                    msg = f"Skipping '{pdf_file}': PDF has no pages."
-                    module_logger.warning(msg)
-                    messages.append(f"[WARN] {msg}")
-                    error_files_details.append({"file": pdf_file, "error": "PDF has no pages"})
-                    error_count +=1 # Consider this a file-specific error/skip
-                    continue
-
-                new_doc = fitz.open() # Create a new PDF
-                new_doc.set_metadata(src_doc.metadata) # Copy metadata
-                # TOC copying can be complex and error-prone, do it carefully
-                try:
-                    toc = src_doc.get_toc(simple=False) # Get full ToC
-                    if toc:
-                        new_doc.set_toc(toc)
-                except Exception as e_toc:
-                    module_logger.warning(f"Could not copy ToC for '{pdf_file}': {e_toc}")
-                    messages.append(f"[WARN] Could not copy ToC for '{pdf_file}': {e_toc}")
-
-
-                pages_to_keep_indices = []
-                if trim_type == 'f':
-                    # Keep pages from num_pages to the end
-                    start_index = num_pages
-                    if start_index >= original_page_count: # Trying to remove all or more pages
-                        pages_to_keep_indices = []
-                    else:
-                        pages_to_keep_indices = list(range(start_index, original_page_count))
-                elif trim_type == 'l':
-                    # Keep pages from 0 up to (total - num_pages -1)
-                    end_index = original_page_count - num_pages
-                    if end_index <= 0: # Trying to remove all or more pages
-                        pages_to_keep_indices = []
-                    else:
-                        pages_to_keep_indices = list(range(0, end_index))
-                elif trim_type == 'lf':
-                    # Keep pages from 1 to (total - 2)
-                    if original_page_count <= 2: # If 0, 1 or 2 pages, removing 1st and last results in 0 pages
-                        pages_to_keep_indices = []
-                    else:
-                        pages_to_keep_indices = list(range(1, original_page_count - 1))
-                
-                if not pages_to_keep_indices and original_page_count > 0 : # All pages are trimmed
-                    msg = f"All pages trimmed for '{pdf_file}'. Original: {original_page_count} pages."
-                    module_logger.info(msg)
-                    # Save an empty PDF or a PDF with one blank page?
-                    # For now, saving an empty PDF if all pages are trimmed.
-                    new_doc.save(output_path, garbage=4, deflate=True, clean=True)
-                    new_page_count = 0
-
-                elif pages_to_keep_indices:
-                    # new_doc.insert_pdf(src_doc, from_page=pages_to_keep_indices[0], to_page=pages_to_keep_indices[-1], start_at=-1)
-                    # Using show_pdf_page for potentially better handling of complex pages
-                    for pg_num_to_keep in pages_to_keep_indices:
-                        page = src_doc.load_page(pg_num_to_keep)
-                        # Create new page in new_doc with same dimensions
-                        new_page = new_doc.new_page(width=page.rect.width, height=page.rect.height)
-                        # Show original page content on the new page
-                        new_page.show_pdf_page(page.rect, src_doc, pg_num_to_keep)
-                    
-                    new_doc.save(output_path, garbage=4, deflate=True, clean=True, linear=True, no_new_id=True)
-                    new_page_count = len(new_doc)
-                else: # No pages to keep and original was empty
-                     new_doc.save(output_path, garbage=4, deflate=True, clean=True)
-                     new_page_count = 0
-
-
-            msg = f"Page trimming successful for '{pdf_file}'. Original: {original_page_count}, New: {new_page_count}. Saved to '{output_path}'"
-            module_logger.info(msg)
-            messages.append(f"[SUCCESS] {msg}")
-            success_files_details.append({
-                "original": pdf_file, 
-                "processed": os.path.basename(output_path), 
-                "original_pages": original_page_count, 
-                "new_pages": new_page_count
-            })
-            success_count += 1
-
-        except ValueError as ve: # For invalid trim_type if not caught earlier
-            error_msg = str(ve)
-            msg = f"Configuration error for '{pdf_file}': {error_msg}"
-            module_logger.error(msg)
-            messages.append(f"[ERROR] {msg}")
-            error_files_details.append({"file": pdf_file, "error": msg})
-            error_count += 1
-            overall_success = False
-        except Exception as e:
-            error_msg = str(e).split('\n')[0]
-            msg = f"Page trimming failed for '{pdf_file}': {type(e).__name__} - {error_msg}"
-            module_logger.error(msg, exc_info=False)
-            messages.append(f"[ERROR] {msg}")
-            error_files_details.append({"file": pdf_file, "error": msg})
-            error_count += 1
-            overall_success = False
-            if os.path.exists(output_path): # Clean up partially created file
-                try: os.remove(output_path)
-                except Exception: pass
+    in_dir, out_dir = Path(input_dir), Path(output_dir)
+    keep = _trim_keep_slice(trim_type, num_pages)
+    jobs = [(pdf_file, in_dir, out_dir, keep, linearize, garbage_level) for pdf_file in pdf_files]
+    results = run_jobs(_process_one_trim, jobs, max_workers or _DEFAULT_MAX_WORKERS)
+    success_files_details = [r["detail"] for r in results if r["ok"]]  # List of {"original", "processed", "original_pages", "new_pages"}
+    error_files_details = [{"file": r["file"], "error": r["error"]} for r in results if not r["ok"]]  # List of {"file", "error"}
+    success_count = len(success_files_details)
+    error_count = len(error_files_details)
+    # Per-file successes are in success_files either way
+    messages.extend(m for r in results if verbose or not r["ok"] for m in r["messages"])
     
     final_summary_msg = f"PDF page trimming finished. Total PDFs: {total_files_to_process}, Succeeded: {success_count}, Failed: {error_count}."
     module_logger.info(final_summary_msg)
     messages.append(f"[INFO] {final_summary_msg}")
 
     return {
-        "success": overall_success and error_count == 0,
+        "success": error_count == 0,
         "messages": messages,
         "total_processed": total_files_to_process,
         "success_count": success_count,
@@ -193,77 +265,122 @@ def remove_pdf_pages_api(input_dir: str, output_dir: str, trim_type: str = 'f',
     }
 
 
-def _remove_specific_pages_from_single_pdf_for_api(file_path: Path, pages_to_delete: list, module_logger_ref: logging.Logger) -> tuple[bool, str, int, int]:
+def _fast_copy(src: Path, dst: Path) -> None:
+    """
+    Internal helper: Copies file contents only (no metadata), since the copy is rewritten right after.
+    Tries a copy-on-write reflink first, then shutil.copyfile, which already uses in-kernel
+    sendfile (Linux) / fcopyfile (macOS).
+    """
+    if _FICLONE is not None:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            try:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+                return
+            except OSError:
+                pass # Filesystem (or OS) can't reflink; fall through to a regular copy
+    shutil.copyfile(src, dst)
+
+
+def _remove_specific_pages_from_single_pdf_for_api(src_path: Path, dst_path: Path, pages_to_delete: list, module_logger_ref: logging.Logger) -> tuple[bool, str, int, int]:
     """
-    Internal helper: Removes specific pages from a single PDF.
+    Internal helper: Removes specific pages from src_path and writes the result to dst_path
+    (which may be the same file, for in-place edits). pages_to_delete must be 0-indexed, sorted and unique.
     Returns: (success_flag, message, original_page_count, final_page_count)
     """
     original_page_count = 0
     final_page_count = 0
     
-    if not file_path.exists() or not file_path.is_file() or file_path.suffix.lower() != '.pdf':
-        return False, f"Invalid PDF file path: {file_path}", 0, 0
+    if src_path.suffix.lower() != '.pdf': # Existence is already known from the directory scan
+        return False, f"Invalid PDF file path: {src_path}", 0, 0
 
-    # Use a temporary file in the same directory as the target file
-    temp_file = file_path.with_name(f"~tmp_{file_path.name}")
+    triage_error = _quick_pdf_triage(src_path)
+    if triage_error:
+        return False, f"Failed to remove pages from '{src_path.name}': {triage_error}", 0, 0
 
+    in_place = src_path.resolve() == dst_path.resolve()
     try:
-        with pikepdf.open(file_path) as pdf:
+        _advise_page_cache(src_path, _FADV_WILLNEED)
+        # allow_overwriting_input lets pikepdf save straight back over the file it was opened from
+        with pikepdf.open(src_path, allow_overwriting_input=in_place) as pdf:
             original_page_count = len(pdf.pages)
-            # Filter and sort pages to delete: must be valid 0-indexed, delete from highest to lowest to avoid index shifts
-            valid_pages_to_delete = sorted(list(set(p for p in pages_to_delete if 0 <= p < original_page_count)), reverse=True)
+            # Pages are pre-sorted by the caller; just clip to this document's page count
+            valid_pages_to_delete = pages_to_delete[:bisect_left(pages_to_delete, original_page_count)]
 
             if not valid_pages_to_delete:
                 final_page_count = original_page_count
-                return True, f"No valid pages to delete from '{file_path.name}'. Original pages: {original_page_count}.", original_page_count, final_page_count
+                if not in_place:
+                    _fast_copy(src_path, dst_path) # Nothing to rewrite; output is an unchanged copy
+                return True, f"No valid pages to delete from '{src_path.name}'. Original pages: {original_page_count}.", original_page_count, final_page_count
             
-            pages_deleted_log = sorted([p+1 for p in valid_pages_to_delete]) # For logging 1-indexed
+            pages_deleted_log = [p+1 for p in valid_pages_to_delete] # For logging 1-indexed
 
-            for page_num_idx in valid_pages_to_delete:
-                del pdf.pages[page_num_idx]
+            # Group into runs of consecutive pages; delete each run with one slice, highest run first to avoid index shifts
+            runs = [[p for _, p in grp] for _, grp in groupby(enumerate(valid_pages_to_delete), lambda x: x[1] - x[0])]
+            for run in reversed(runs):
+                del pdf.pages[run[0]:run[-1] + 1]
             
             final_page_count = len(pdf.pages)
-            pdf.save(temp_file) # Save changes to temporary file
-        
-        # Replace original file with temporary file
-        shutil.move(str(temp_file), str(file_path)) # Use shutil.move for robustness
-        return True, f"Successfully removed pages {pages_deleted_log} from '{file_path.name}'. Original: {original_page_count}, Final: {final_page_count}.", original_page_count, final_page_count
+            pdf.save(dst_path)
+        _advise_page_cache(dst_path, _FADV_DONTNEED)
+        return True, f"Successfully removed pages {pages_deleted_log} from '{src_path.name}'. Original: {original_page_count}, Final: {final_page_count}.", original_page_count, final_page_count
     
     except pikepdf.PasswordError:
-        return False, f"PDF '{file_path.name}' is encrypted. Please decrypt it first.", original_page_count, original_page_count
+        return False, f"PDF '{src_path.name}' is encrypted. Please decrypt it first.", original_page_count, original_page_count
     except Exception as e:
-        return False, f"Failed to remove pages from '{file_path.name}': {type(e).__name__} - {str(e).splitlines()[0]}", original_page_count, original_page_count
-    finally:
-        if temp_file.exists():
+        module_logger_ref.debug(f"Page removal failed for '{src_path}'", exc_info=True)
+        if not in_place:
             try:
-                temp_file.unlink()
+                dst_path.unlink(missing_ok=True) # Don't leave a partially written output behind
             except OSError as e_os:
-                module_logger_ref.warning(f"Could not delete temporary file '{temp_file}': {e_os}")
+                module_logger_ref.warning(f"Could not delete partial output '{dst_path}': {e_os}")
+        return False, f"Failed to remove pages from '{src_path.name}': {type(e).__name__} - {str(e).splitlines()[0]}", original_page_count, original_page_count
 
 
-def process_pdfs_for_specific_page_removal_api(input_dir: str, output_dir: str, pages_to_delete_str: str) -> dict:
+def _process_one_remove(filename: str, in_dir: Path, out_dir: Path, pages_to_delete: list) -> dict:
+    """
+    Internal helper (thread pool worker): Removes the given pages from one PDF, writing the result to output_dir.
+    Returns a result record: {"file", "ok", "messages", "detail", "error"}.
+    """
+    input_file_path = in_dir / filename
+    output_file_path = out_dir / filename # Processed file will have same name in output_dir
+
+    file_processed_successfully, process_message, orig_pg, final_pg = _remove_specific_pages_from_single_pdf_for_api(
+        input_file_path, output_file_path, pages_to_delete, module_logger)
+    
+    if file_processed_successfully:
+        detail = {
+            "file": filename, 
+            "original_pages": orig_pg,
+            "final_pages": final_pg,
+            "removed_pages_specified": [p+1 for p in pages_to_delete[:bisect_left(pages_to_delete, orig_pg)]]
+        }
+        return {"file": filename, "ok": True, "messages": [f"[SUCCESS] {process_message}"], "detail": detail, "error": None}
+    # process_message already contains file and error.
+    return {"file": filename, "ok": False, "messages": [f"[ERROR] {process_message}"], "detail": None, "error": process_message}
+
+
+def process_pdfs_for_specific_page_removal_api(input_dir: str, output_dir: str, pages_to_delete_str: str, max_workers: int = None,
+                                               verbose: bool = False) -> dict:
     """
     API-adapted: Iterates through PDFs in input_dir, removes specific pages, saves to output_dir.
     Args:
         input_dir (str): Directory containing PDF files.
         output_dir (str): Directory to save processed PDFs.
         pages_to_delete_str (str): Space-separated string of 0-indexed page numbers.
+        max_workers (int, optional): Max worker threads. Defaults to min(CPU count, 8).
+        verbose (bool): Also add a [SUCCESS] message per PDF. Errors, warnings and the summary are always
+            reported; per-file results are in success_files/error_files either way.
     Returns:
         dict: Operation results.
     """
     module_logger.info(f"API: Removing specific pages '{pages_to_delete_str}' from PDFs in '{input_dir}', output to '{output_dir}'.")
     messages = []
-    success_files_details = []
-    error_files_details = []
-    processed_count = 0
-    success_count = 0
-    error_count = 0
-    overall_success = True
 
     try:
         pages_to_delete = [int(p.strip()) for p in pages_to_delete_str.split()]
         if not all(p >= 0 for p in pages_to_delete):
             raise ValueError("Page numbers must be non-negative integers.")
+        pages_to_delete = sorted(set(pages_to_delete)) # Sorted and de-duplicated once for the whole batch
     except ValueError:
         msg = "Invalid page numbers string. Must be space-separated non-negative integers."
         module_logger.error(msg)
@@ -275,8 +392,8 @@ def process_pdfs_for_specific_page_removal_api(input_dir: str, output_dir: str,
         return {"success": False, "messages": [f"[ERROR] {msg}"], "processed_count": 0, "success_count": 0, "error_count": 1}
 
     try:
-        pdf_files = [f for f in os.listdir(input_dir) if f.lower().endswith('.pdf')]
-    except Exception as e:
+        pdf_files = _list_pdf_files(input_dir)
+    except OSError as e:
         msg = f"Could not read input directory '{input_dir}': {e}"
         module_logger.error(msg)
         return {"success": False, "messages": [f"[ERROR] {msg}"], "processed_count": 0, "success_count": 0, "error_count": 1}
@@ -296,51 +413,22 @@ def process_pdfs_for_specific_page_removal_api(input_dir: str, output_dir: str,
 
     total_files_to_process = len(pdf_files)
 
-    for filename in tqdm(pdf_files, desc="API Removing Specific Pages", unit="file", disable=True):
-        input_file_path = Path(input_dir) / filename
-        output_file_path = Path(output_dir) / filename # Processed file will have same name in output_dir
-        processed_count += 1
-        
-        # 1. Copy file to output directory first
-        try:
-            if input_file_path.resolve() != output_file_path.resolve(): # Avoid copying if input and output are same file
-                 shutil.copy2(str(input_file_path), str(output_file_path))
-            # If they are the same, the operation will be in-place on the file in output_dir (which is also input_dir)
-        except Exception as e_copy:
-            msg = f"Failed to copy '{filename}' to output directory '{output_dir}': {e_copy}"
-            module_logger.error(msg)
-            messages.append(f"[ERROR] {msg}")
-            error_files_details.append({"file": filename, "error": f"Copy to output failed: {e_copy}"})
-            error_count += 1
-            overall_success = False
-            continue # Skip processing this file
-
-        # 2. Process the file in the output directory
-        file_processed_successfully, process_message, orig_pg, final_pg = _remove_specific_pages_from_single_pdf_for_api(output_file_path, pages_to_delete, module_logger)
-        
-        if file_processed_successfully:
-            messages.append(f"[SUCCESS] {process_message}")
-            success_files_details.append({
-                "file": filename, 
-                "original_pages": orig_pg,
-                "final_pages": final_pg,
-                "removed_pages_specified": sorted([p+1 for p in pages_to_delete if 0 <= p < orig_pg])
-            })
-            success_count += 1
-        else:
-            messages.append(f"[ERROR] {process_message}") # process_message already contains file and error
-            error_files_details.append({"file": filename, "error": process_message})
-            error_count += 1
-            overall_success = False
-            # If processing failed on the copy, the corrupted/original copy remains in output_dir.
-            # Depending on desired behavior, could attempt to delete output_file_path here.
+    in_dir, out_dir = Path(input_dir), Path(output_dir)
+    jobs = [(filename, in_dir, out_dir, pages_to_delete) for filename in pdf_files]
+    results = run_jobs(_process_one_remove, jobs, max_workers or _DEFAULT_MAX_WORKERS, use_threads=True)
+    success_files_details = [r["detail"] for r in results if r["ok"]]
+    error_files_details = [{"file": r["file"], "error": r["error"]} for r in results if not r["ok"]]
+    success_count = len(success_files_details)
+    error_count = len(error_files_details)
+    # Per-file successes are in success_files either way
+    messages.extend(m for r in results if verbose or not r["ok"] for m in r["messages"])
 
     final_summary_msg = f"Specific page removal finished. Total PDFs: {total_files_to_process}, Succeeded: {success_count}, Failed: {error_count}."
     module_logger.info(final_summary_msg)
     messages.append(f"[INFO] {final_summary_msg}")
 
     return {
-        "success": overall_success and error_count == 0,
+        "success": error_count == 0,
         "messages": messages,
         "total_processed": total_files_to_process,
         "success_count": success_count,
@@ -350,23 +438,92 @@ def process_pdfs_for_specific_page_removal_api(input_dir: str, output_dir: str,
     }
 
 
-def repair_pdfs_by_rebuilding_api(input_dir: str, output_dir: str) -> dict:
+def _repair_scratch_dir(input_path: Path):
+    """
+    Internal helper: The PDF_TMP_DIR scratch directory if one is configured and has room for
+    twice the input's size, else None (temp files then go next to the output).
+    """
+    if _PDF_TMP_DIR is None:
+        return None
+    try:
+        if shutil.disk_usage(_PDF_TMP_DIR).free < 2 * input_path.stat().st_size:
+            return None
+    except OSError:
+        return None
+    return _PDF_TMP_DIR
+
+
+def _process_one_repair(filename: str, in_dir: Path, out_dir: Path, linearize: bool = False) -> dict:
+    """
+    Internal helper (thread pool worker): Re-saves one PDF with pikepdf to rebuild its structure.
+    Returns a result record: {"file", "ok", "messages", "detail", "error"}.
+    """
+    input_path = in_dir / filename
+    final_output_path = out_dir / filename
+    temp_output_path = None
+
+    triage_error = _quick_pdf_triage(input_path)
+    if triage_error:
+        msg = f"Repair failed for '{filename}': {triage_error}"
+        module_logger.error(msg)
+        return {"file": filename, "ok": False, "messages": [f"[ERROR] {msg}"], "detail": None, "error": msg}
+
+    try:
+        scratch_dir = _repair_scratch_dir(input_path)
+        if scratch_dir is None:
+            # Use a temporary file in the output directory to avoid issues if input_dir == output_dir
+            temp_output_path = out_dir / f"~temp_repaired_{filename}"
+        else:
+            fd, temp_name = tempfile.mkstemp(prefix="~temp_repaired_", suffix=".pdf", dir=scratch_dir)
+            os.close(fd)
+            temp_output_path = Path(temp_name)
+
+        _advise_page_cache(input_path, _FADV_WILLNEED)
+        with pikepdf.open(input_path, allow_overwriting_input=False) as pdf: # Open original
+            pdf.save(temp_output_path, linearize=linearize) # Save to temp location
+
+        if scratch_dir is None:
+            # The temp file sits next to the final path, so a rename replaces any existing target
+            # (including the input itself when input_dir == output_dir) without extra stat calls.
+            os.replace(temp_output_path, final_output_path)
+        else:
+            shutil.move(temp_output_path, final_output_path) # Copies across filesystems
+        _advise_page_cache(final_output_path, _FADV_DONTNEED)
+
+        msg = f"Repair successful for '{filename}'. Saved to '{final_output_path}'"
+        module_logger.info(msg)
+        return {"file": filename, "ok": True, "messages": [f"[SUCCESS] {msg}"], "detail": {"original": filename, "repaired": filename}, "error": None}
+    except Exception as e:
+        error_msg = str(e).split('\n')[0]
+        msg = f"Repair failed for '{filename}': {type(e).__name__} - {error_msg}"
+        module_logger.error(msg, exc_info=False)
+        return {"file": filename, "ok": False, "messages": [f"[ERROR] {msg}"], "detail": None, "error": msg}
+    finally:
+        if temp_output_path is not None:
+            try:
+                temp_output_path.unlink() # Only still present if saving or renaming failed
+            except FileNotFoundError:
+                pass
+            except OSError as e_os:
+                module_logger.warning(f"Could not delete temporary file '{temp_output_path}': {e_os}")
+
+
+def repair_pdfs_by_rebuilding_api(input_dir: str, output_dir: str, max_workers: int = None, linearize: bool = False,
+                                  verbose: bool = False) -> dict:
     """
     API-adapted: Attempts to repair PDF internal structure by re-saving.
     Args:
         input_dir (str): Directory containing PDF files.
         output_dir (str): Directory to save repaired PDFs.
+        max_workers (int, optional): Max worker threads. Defaults to min(CPU count, 8).
+        linearize (bool): Write linearized ("fast web view") PDFs; off by default as it costs an extra pass.
+        verbose (bool): Also add a [SUCCESS] message per PDF. Errors, warnings and the summary are always
+            reported; per-file results are in success_files/error_files either way.
     Returns:
         dict: Operation results.
     """
     module_logger.info(f"API: Starting PDF repair from '{input_dir}' to '{output_dir}'.")
     messages = []
-    success_files_details = []  # List of {"original": "file.pdf", "repaired": "file.pdf"}
-    error_files_details = []    # List of {"file": "file.pdf", "error": "error message"}
-    processed_count = 0
-    success_count = 0
-    error_count = 0
-    overall_success = True
 
     if not os.path.isdir(input_dir):
         msg = f"Input directory '{input_dir}' does not exist."
@@ -374,8 +531,8 @@ def repair_pdfs_by_rebuilding_api(input_dir: str, output_dir: str) -> dict:
         return {"success": False, "messages": [f"[ERROR] {msg}"], "processed_count": 0, "success_count": 0, "error_count": 1}
 
     try:
-        pdf_files = [f for f in os.listdir(input_dir) if f.lower().endswith('.pdf')]
-    except Exception as e:
+        pdf_files = _list_pdf_files(input_dir)
+    except OSError as e:
         msg = f"Could not read input directory '{input_dir}': {e}"
         module_logger.error(msg)
         return {"success": False, "messages": [f"[ERROR] {msg}"], "processed_count": 0, "success_count": 0, "error_count": 1}
@@ -395,51 +552,22 @@ def repair_pdfs_by_rebuilding_api(input_dir: str, output_dir: str) -> dict:
 
     total_files_to_process = len(pdf_files)
 
-    for filename in tqdm(pdf_files, desc="API Repairing PDFs", unit="file", disable=True):
-        input_path = os.path.join(input_dir, filename)
-        # Use a temporary file in the output directory to avoid issues if input_dir == output_dir
-        temp_output_filename = f"~temp_repaired_{filename}"
-        temp_output_path = os.path.join(output_dir, temp_output_filename)
-        final_output_path = os.path.join(output_dir, filename)
-        processed_count += 1
-
-        try:
-            with pikepdf.open(input_path, allow_overwriting_input=False) as pdf: # Open original
-                pdf.save(temp_output_path) # Save to temp location in output_dir
-
-            # If input_dir and output_dir are the same, and temp_output_path is different from final_output_path
-            # (which it is due to ~temp_ prefix), then move.
-            # If input_dir is different from output_dir, this move is also correct.
-            if os.path.exists(final_output_path) and not os.path.samefile(temp_output_path, final_output_path):
-                os.remove(final_output_path) # Remove existing target if overwriting
-            shutil.move(temp_output_path, final_output_path)
-
-            msg = f"Repair successful for '{filename}'. Saved to '{final_output_path}'"
-            module_logger.info(msg)
-            messages.append(f"[SUCCESS] {msg}")
-            success_files_details.append({"original": filename, "repaired": filename})
-            success_count += 1
-        except Exception as e:
-            error_msg = str(e).split('\n')[0]
-            msg = f"Repair failed for '{filename}': {type(e).__name__} - {error_msg}"
-            module_logger.error(msg, exc_info=False)
-            messages.append(f"[ERROR] {msg}")
-            error_files_details.append({"file": filename, "error": msg})
-            error_count += 1
-            overall_success = False
-        finally:
-            if os.path.exists(temp_output_path):
-                try:
-                    os.remove(temp_output_path)
-                except OSError as e_os:
-                    module_logger.warning(f"Could not delete temporary file '{temp_output_path}': {e_os}")
+    in_dir, out_dir = Path(input_dir), Path(output_dir)
+    jobs = [(filename, in_dir, out_dir, linearize) for filename in pdf_files]
+    results = run_jobs(_process_one_repair, jobs, max_workers or _DEFAULT_MAX_WORKERS, use_threads=True)
+    success_files_details = [r["detail"] for r in results if r["ok"]]  # List of {"original", "repaired"}
+    error_files_details = [{"file": r["file"], "error": r["error"]} for r in results if not r["ok"]]  # List of {"file", "error"}
+    success_count = len(success_files_details)
+    error_count = len(error_files_details)
+    # Per-file successes are in success_files either way
+    messages.extend(m for r in results if verbose or not r["ok"] for m in r["messages"])
     
     final_summary_msg = f"PDF repair process finished. Total PDFs: {total_files_to_process}, Succeeded: {success_count}, Failed: {error_count}."
     module_logger.info(final_summary_msg)
     messages.append(f"[INFO] {final_summary_msg}")
 
     return {
-        "success": overall_success and error_count == 0,
+        "success": error_count == 0,
         "messages": messages,
         "total_processed": total_files_to_process,
         "success_count": success_count,
@@ -3,28 +3,111 @@ import os
 import time
 import logging
 import pikepdf
-from tqdm import tqdm
+from ._parallel import run_jobs
 
 module_logger = logging.getLogger(__name__)
 
-def encode_pdfs_api(input_dir: str, output_dir: str, password: str) -> dict:
+# pikepdf's AES rewrite is CPU-bound, so files are spread over worker processes
+_DEFAULT_MAX_WORKERS = min(os.cpu_count() or 1, 8)
+
+# Restrictions applied to every encrypted PDF. Identical for all files, so built once at import.
+# Field names follow pikepdf >= 3 (Permissions is an immutable NamedTuple there); older versions fall back to
+# pikepdf's defaults and encode_pdfs_api reports that once per call.
+_PERMISSIONS_FALLBACK_WARNING = None
+try:
+    _ENCRYPTION_PERMISSIONS = pikepdf.Permissions(
+        accessibility=False,
+        extract=False,
+        modify_annotation=False,
+        modify_assembly=False,
+        modify_form=False,
+        modify_other=False,
+        print_lowres=False,
+        print_highres=False,
+    )
+except (TypeError, AttributeError) as e_perm:
+    _ENCRYPTION_PERMISSIONS = pikepdf.Permissions()
+    _PERMISSIONS_FALLBACK_WARNING = (f"Could not set specific PDF permissions ('{e_perm}'). PDFs will be encrypted "
+                                     "with default permissions, which might be less restrictive than intended. "
+                                     "Please check your pikepdf library version (3.0+ recommended).")
+    module_logger.warning(_PERMISSIONS_FALLBACK_WARNING)
+
+
+def _list_pdf_files(input_dir: str) -> list:
+    """
+    Internal helper: Names of regular .pdf files in input_dir, skipping directories and
+    '~'-prefixed temp files left by interrupted saves. Raises OSError if the directory can't be read.
+    """
+    with os.scandir(input_dir) as it:
+        return [e.name for e in it
+                if e.name.lower().endswith('.pdf') and not e.name.startswith('~') and e.is_file()]
+
+def _trailer_has_encrypt(path: str, tail_size: int = 4096) -> bool:
+    """Internal helper: True if the last tail_size bytes of the file mention /Encrypt."""
+    with open(path, 'rb') as f:
+        f.seek(max(0, os.fstat(f.fileno()).st_size - tail_size))
+        return b'/Encrypt' in f.read()
+
+def _encrypt_one(filename: str, input_dir: str, output_dir: str, encryption: pikepdf.Encryption) -> dict:
+    """
+    Internal helper (process pool worker): Encrypts one PDF to output_dir as 'encrypted_<name>'.
+    encryption is the spec built once by encode_pdfs_api and shared by every file.
+    Returns a result record: {"file", "ok", "messages", "detail", "error"}.
+    """
+    input_path = os.path.join(input_dir, filename)
+    output_filename = f"encrypted_{filename}"
+    output_path = os.path.join(output_dir, output_filename)
+    messages = []
+
+    try:
+        # The trailer (or xref stream) at the end of the file carries /Encrypt; checking it first
+        # skips a full pikepdf parse for files that are already encrypted. Anything it misses is
+        # still caught by is_encrypted / PasswordError below.
+        if _trailer_has_encrypt(input_path):
+            msg = f"Skipping '{filename}': PDF is already encrypted."
+            module_logger.warning(msg)
+            messages.append(f"[WARN] {msg}")
+            return {"file": filename, "ok": False, "messages": messages, "detail": None, "error": "Already encrypted"}
+
+        with pikepdf.open(input_path) as pdf:
+            if pdf.is_encrypted:
+                msg = f"Skipping '{filename}': PDF is already encrypted."
+                module_logger.warning(msg)
+                messages.append(f"[WARN] {msg}")
+                return {"file": filename, "ok": False, "messages": messages, "detail": None, "error": "Already encrypted"}
+
+            pdf.save(output_path, encryption=encryption)
+        module_logger.info("Encryption successful: '%s' -> '%s'", filename, output_filename)
+        return {"file": filename, "ok": True, "messages": messages, "detail": {"original": filename, "encrypted": output_filename}, "error": None}
+    except pikepdf.PasswordError: 
+        msg = f"Skipping '{filename}': PDF is likely already encrypted and password protected."
+        module_logger.warning(msg)
+        messages.append(f"[WARN] {msg}")
+        return {"file": filename, "ok": False, "messages": messages, "detail": None, "error": "Already encrypted or password error on open"}
+    except Exception as e:
+        # Catch other general exceptions during the encryption process
+        error_msg = str(e).split('\n')[0]
+        full_error_msg = f"Encryption failed for '{filename}': {type(e).__name__} - {error_msg}"
+        module_logger.error(full_error_msg, exc_info=True) 
+        messages.append(f"[ERROR] {full_error_msg}")
+        return {"file": filename, "ok": False, "messages": messages, "detail": None, "error": full_error_msg} # Store the full error message
+
+def encode_pdfs_api(input_dir: str, output_dir: str, password: str, max_workers: int = None,
+                    verbose: bool = False) -> dict:
     """
     API-adapted: PDF Encryption Function (AES-256 Encryption).
     Args:
         input_dir (str): The directory containing PDF files to encrypt.
         output_dir (str): Directory to save encrypted PDFs.
         password (str): Encryption password.
+        max_workers (int, optional): Max worker processes. Defaults to min(CPU count, 8).
+        verbose (bool): Also add a [SUCCESS] message per PDF. Errors, warnings and the summary are always
+            reported; per-file results are in success_files/error_files either way.
     Returns:
         dict: Operation results.
     """
     module_logger.info(f"API: Starting PDF encryption from '{input_dir}' to '{output_dir}' with provided password.")
     messages = []
-    success_files_details = []  # List of {"original": "file.pdf", "encrypted": "encrypted_file.pdf"}
-    error_files_details = []    # List of {"file": "file.pdf", "error": "error message"}
-    processed_count = 0 # Counts files attempted
-    success_count = 0
-    error_count = 0
-    overall_success = True
 
     if not password:
         msg = "Password cannot be empty for encryption."
@@ -37,8 +120,8 @@ def encode_pdfs_api(input_dir: str, output_dir: str, password: str) -> dict:
         return {"success": False, "messages": [f"[ERROR] {msg}"], "processed_count": 0, "success_count": 0, "error_count": 1, "success_files": [], "error_files": []}
 
     try:
-        pdf_files = [f for f in os.listdir(input_dir) if f.lower().endswith('.pdf')]
-    except Exception as e:
+        pdf_files = _list_pdf_files(input_dir)
+    except OSError as e:
         msg = f"Could not read input directory '{input_dir}': {e}"
         module_logger.error(msg)
         return {"success": False, "messages": [f"[ERROR] {msg}"], "processed_count": 0, "success_count": 0, "error_count": 1, "success_files": [], "error_files": []}
@@ -58,77 +141,30 @@ def encode_pdfs_api(input_dir: str, output_dir: str, password: str) -> dict:
 
     total_files = len(pdf_files)
 
-    for filename in tqdm(pdf_files, desc="API Encrypting PDFs", unit="file", disable=True):
-        input_path = os.path.join(input_dir, filename)
-        output_filename = f"encrypted_{filename}"
-        output_path = os.path.join(output_dir, output_filename)
-        processed_count +=1
-
-        try:
-            with pikepdf.open(input_path) as pdf:
-                if pdf.is_encrypted:
-                    msg = f"Skipping '{filename}': PDF is already encrypted."
-                    module_logger.warning(msg)
-                    messages.append(f"[WARN] {msg}")
-                    error_files_details.append({"file": filename, "error": "Already encrypted"})
-                    error_count +=1 
-                    continue
-
-                permissions_to_set = pikepdf.Permissions() # Start with default (all True)
-                try:
-                    # Attempt to set desired restrictions
-                    permissions_to_set.copy_content = False
-                    permissions_to_set.extract_content_accessibility = False
-                    permissions_to_set.modify_content = False
-                    permissions_to_set.modify_annotations = False 
-                    permissions_to_set.fill_forms = False 
-                    permissions_to_set.assemble_document = False
-                    permissions_to_set.print_low_resolution = False
-                    permissions_to_set.print_high_resolution = False
-                except AttributeError as e_attr:
-                    # Log a warning if specific permissions cannot be set
-                    warning_msg = (f"Could not set specific PDF permissions for '{filename}' due to an AttributeError "
-                                   f"('{e_attr}'). The PDF will be encrypted with default permissions, which might be "
-                                   "less restrictive than intended. Please check your pikepdf library version "
-                                   "and installation (version 3.0+ recommended).")
-                    module_logger.warning(warning_msg)
-                    messages.append(f"[WARN] {warning_msg}")
-                    # 'permissions_to_set' remains the default pikepdf.Permissions() object (all flags True)
-                    # This means we are "allowing" all these actions from pikepdf's perspective.
-                    # However, PDF viewers often apply their own restrictive defaults when a user password is set.
-
-                pdf.save(output_path, encryption=pikepdf.Encryption(
-                    user=password,
-                    owner=password, 
-                    allow=permissions_to_set # Pass the (potentially modified or default) permissions object
-                ))
-            success_count += 1
-            msg = f"Encryption successful: '{filename}' -> '{output_filename}'"
-            module_logger.info(msg)
-            messages.append(f"[SUCCESS] {msg}")
-            success_files_details.append({"original": filename, "encrypted": output_filename})
-        except pikepdf.PasswordError: 
-            msg = f"Skipping '{filename}': PDF is likely already encrypted and password protected."
-            module_logger.warning(msg)
-            messages.append(f"[WARN] {msg}")
-            error_files_details.append({"file": filename, "error": "Already encrypted or password error on open"})
-            error_count +=1
-        except Exception as e:
-            # Catch other general exceptions during the encryption process
-            error_msg = str(e).split('\n')[0]
-            full_error_msg = f"Encryption failed for '{filename}': {type(e).__name__} - {error_msg}"
-            module_logger.error(full_error_msg, exc_info=True) 
-            messages.append(f"[ERROR] {full_error_msg}")
-            error_files_details.append({"file": filename, "error": full_error_msg}) # Store the full error message
-            error_count += 1
-            overall_success = False
+    if _PERMISSIONS_FALLBACK_WARNING:
+        messages.append(f"[WARN] {_PERMISSIONS_FALLBACK_WARNING}")
+
+    # Same spec for every file: the password is encoded once here instead of per save
+    password_bytes = password.encode('utf-8')
+    encryption = pikepdf.Encryption(user=password_bytes, owner=password_bytes, allow=_ENCRYPTION_PERMISSIONS)
+    jobs = [(filename, input_dir, output_dir, encryption) for filename in pdf_files]
+    results = run_jobs(_encrypt_one, jobs, max_workers or _DEFAULT_MAX_WORKERS)
+    for record in results:
+        messages.extend(record["messages"])
+    success_files_details = [r["detail"] for r in results if r["ok"]]
+    # Success lines are built here rather than in the workers, so the per-file path only returns the detail dict
+    if verbose:
+        messages.extend(f"[SUCCESS] Encryption successful: '{d['original']}' -> '{d['encrypted']}'" for d in success_files_details)
+    error_files_details = [{"file": r["file"], "error": r["error"]} for r in results if not r["ok"]]
+    success_count = len(success_files_details)
+    error_count = len(error_files_details)
     
     final_summary_msg = f"PDF encryption finished. Total PDFs: {total_files}, Succeeded: {success_count}, Failed/Skipped: {error_count}."
     module_logger.info(final_summary_msg)
     messages.append(f"[INFO] {final_summary_msg}")
 
     return {
-        "success": overall_success and error_count == 0, 
+        "success": error_count == 0, 
         "messages": messages,
         "total_processed": total_files, 
         "success_count": success_count,
@@ -137,23 +173,51 @@ def encode_pdfs_api(input_dir: str, output_dir: str, password: str) -> dict:
         "error_files": error_files_details
     }
 
-def decode_pdfs_api(input_dir: str, password: str) -> dict:
+def _decrypt_one(filename: str, input_dir: str, password: str) -> dict:
+    """
+    Internal helper (process pool worker): Decrypts one PDF in place.
+    Returns a result record: {"file", "ok", "messages", "detail", "error"}; ok is None if the PDF was not encrypted.
+    """
+    input_path = os.path.join(input_dir, filename)
+
+    try:
+        # allow_overwriting_input lets pikepdf save straight back over the file it was opened from
+        with pikepdf.open(input_path, password=password, allow_overwriting_input=True) as pdf:
+            if not pdf.is_encrypted:
+                msg = f"Skipping '{filename}': PDF is not encrypted."
+                module_logger.info(msg)
+                return {"file": filename, "ok": None, "messages": [f"[INFO] {msg}"], "detail": None, "error": None}
+            
+            pdf.save(input_path)
+
+        module_logger.info("Decryption successful: '%s' (overwritten)", filename)
+        return {"file": filename, "ok": True, "messages": [], "detail": {"file": filename, "status": "decrypted"}, "error": None}
+
+    except pikepdf.PasswordError:
+        error_msg = "Incorrect password or PDF is not encrypted with this password."
+        msg = f"Decryption failed for '{filename}': {error_msg}"
+        module_logger.warning(msg) 
+        return {"file": filename, "ok": False, "messages": [f"[FAIL] {msg}"], "detail": None, "error": error_msg}
+    except Exception as e:
+        error_msg = str(e).split('\n')[0]
+        msg = f"Error processing '{filename}' for decryption: {type(e).__name__} - {error_msg}"
+        module_logger.error(msg, exc_info=False)
+        return {"file": filename, "ok": False, "messages": [f"[ERROR] {msg}"], "detail": None, "error": msg}
+
+def decode_pdfs_api(input_dir: str, password: str, max_workers: int = None, verbose: bool = False) -> dict:
     """
     API-adapted: Decrypts password-protected PDF files.
     Args:
         input_dir (str): The directory containing PDF files to decrypt.
         password (str): Decryption password.
+        max_workers (int, optional): Max worker processes. Defaults to min(CPU count, 8).
+        verbose (bool): Also add a [SUCCESS] message per PDF. Errors, warnings and the summary are always
+            reported; per-file results are in success_files/error_files either way.
     Returns:
         dict: Operation results including success status and processed files details.
     """
     module_logger.info(f"API: Starting PDF decryption in '{input_dir}' with provided password.")
     messages = []
-    success_files_details = []  # List of {"file": "filename.pdf", "status": "decrypted"}
-    error_files_details = []    # List of {"file": "filename.pdf", "error": "error message"}
-    processed_count = 0
-    success_count = 0
-    error_count = 0
-    overall_success = True
 
     # Input validation
     if not password:
@@ -167,8 +231,8 @@ def decode_pdfs_api(input_dir: str, password: str) -> dict:
         return {"success": False, "messages": [f"[ERROR] {msg}"], "processed_count": 0, "success_count": 0, "error_count": 1, "success_files": [], "error_files": []}
 
     try:
-        pdf_files = [f for f in os.listdir(input_dir) if f.lower().endswith('.pdf')]
-    except Exception as e:
+        pdf_files = _list_pdf_files(input_dir)
+    except OSError as e:
         msg = f"Could not read input directory '{input_dir}': {e}"
         module_logger.error(msg)
         return {"success": False, "messages": [f"[ERROR] {msg}"], "processed_count": 0, "success_count": 0, "error_count": 1, "success_files": [], "error_files": []}
@@ -181,58 +245,23 @@ def decode_pdfs_api(input_dir: str, password: str) -> dict:
 
     total_files = len(pdf_files)
 
-    for filename in tqdm(pdf_files, desc="API Decrypting PDFs", unit="file", disable=True):
-        input_path = os.path.join(input_dir, filename)
-        temp_filename = f"~decr_temp_{filename}"
-        temp_path = os.path.join(input_dir, temp_filename)
-        processed_count +=1
-
-        try:
-            with pikepdf.open(input_path, password=password, allow_overwriting_input=True) as pdf:
-                if not pdf.is_encrypted:
-                    msg = f"Skipping '{filename}': PDF is not encrypted."
-                    module_logger.info(msg)
-                    messages.append(f"[INFO] {msg}")
-                    continue 
-                
-                pdf.save(temp_path) 
-            
-            os.replace(temp_path, input_path)
-            success_count += 1
-            msg = f"Decryption successful: '{filename}' (overwritten)"
-            module_logger.info(msg)
-            messages.append(f"[SUCCESS] {msg}")
-            success_files_details.append({"file": filename, "status": "decrypted"})
-
-        except pikepdf.PasswordError:
-            error_msg = "Incorrect password or PDF is not encrypted with this password."
-            msg = f"Decryption failed for '{filename}': {error_msg}"
-            module_logger.warning(msg) 
-            messages.append(f"[FAIL] {msg}") 
-            error_files_details.append({"file": filename, "error": error_msg})
-            error_count += 1
-            overall_success = False 
-        except Exception as e:
-            error_msg = str(e).split('\n')[0]
-            msg = f"Error processing '{filename}' for decryption: {type(e).__name__} - {error_msg}"
-            module_logger.error(msg, exc_info=False)
-            messages.append(f"[ERROR] {msg}")
-            error_files_details.append({"file": filename, "error": msg})
-            error_count += 1
-            overall_success = False
-        finally:
-            if os.path.exists(temp_path):
-                try:
-                    os.remove(temp_path)
-                except OSError as e_os:
-                    module_logger.warning(f"Could not delete temporary file '{temp_path}': {e_os}")
+    jobs = [(filename, input_dir, password) for filename in pdf_files]
+    results = run_jobs(_decrypt_one, jobs, max_workers or _DEFAULT_MAX_WORKERS)
+    for record in results:
+        messages.extend(record["messages"])
+    success_files_details = [r["detail"] for r in results if r["ok"]]
+    if verbose:
+        messages.extend(f"[SUCCESS] Decryption successful: '{d['file']}' (overwritten)" for d in success_files_details)
+    error_files_details = [{"file": r["file"], "error": r["error"]} for r in results if r["ok"] is False]
+    success_count = len(success_files_details)
+    error_count = len(error_files_details)
     
     final_summary_msg = f"PDF decryption finished. Total PDFs: {total_files}, Succeeded: {success_count}, Failed: {error_count}."
     module_logger.info(final_summary_msg)
     messages.append(f"[INFO] {final_summary_msg}")
 
     return {
-        "success": overall_success and error_count == 0,
+        "success": error_count == 0,
         "messages": messages,
         "total_processed": total_files,
         "success_count": success_count,
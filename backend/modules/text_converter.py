@@ -1,29 +1,116 @@
 import os
 import re
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from ebooklib import epub
-from bs4 import BeautifulSoup
-from tqdm import tqdm
+from lxml import etree, html as lxml_html
 import fitz
+from ._parallel import run_jobs
 
 module_logger = logging.getLogger(__name__)
 
-def epub_to_txt_api(input_dir: str, output_dir: str) -> dict:
+# HTML parsing and PDF text extraction are CPU-bound, so files are spread over worker processes
+_DEFAULT_MAX_WORKERS = min(os.cpu_count() or 1, 8)
+
+# Block elements whose text epub_to_txt_api emits, one line each. Blocks nested in a p/li are skipped,
+# their text is already part of the enclosing block.
+_BLOCK_XPATH_EXPR = (
+    './/*[self::p or self::h1 or self::h2 or self::h3 or self::h4 or self::h5 or self::h6 or self::div or self::li]'
+    '[not(ancestor::p or ancestor::li)]'
+)
+_BLOCK_XPATH = etree.XPath(_BLOCK_XPATH_EXPR)
+
+# Chapter threads of a single EPUB. lxml parses and evaluates XPath without the GIL, but a compiled XPath
+# object serializes its own evaluations, so each thread compiles its copy (_init_chapter_thread).
+_MAX_CHAPTER_THREADS = 4
+_chapter_thread = threading.local()
+
+# Post-processing patterns for pdf_to_txt_api's 'compact' and 'clean' formats
+_RE_NL3 = re.compile(r'\n{3,}')
+_RE_NL2 = re.compile(r'\n{2,}')
+_RE_SPACES = re.compile(r'[ \t]{2,}')
+# Everything except CJK ideographs, ASCII letters/digits, whitespace and common CJK/ASCII punctuation
+_RE_CLEAN_CHARS = re.compile(r'[^\u4e00-\u9fa5a-zA-Z0-9\s\n。，！？、；：“”‘’（）《》〈〉【】「」『』．﹒ :,.!?;\']')
+# Same filter as a translate table for pure-ASCII text, where str.translate runs an order of magnitude faster
+# than the regex. Built from the regex itself so the two can't drift apart.
+_CLEAN_ASCII_TABLE = str.maketrans('', '', ''.join(chr(cp) for cp in range(128) if _RE_CLEAN_CHARS.match(chr(cp))))
+
+
+def _list_files_with_suffix(input_dir: str, suffix: str) -> list:
+    """
+    Internal helper: Names of regular files in input_dir whose name ends with suffix (case-insensitive),
+    skipping directories. Raises OSError if the directory can't be read.
+    """
+    with os.scandir(input_dir) as it:
+        return [e.name for e in it if e.name.lower().endswith(suffix) and e.is_file()]
+
+def _init_chapter_thread():
+    """ThreadPoolExecutor initializer: gives each chapter thread its own compiled block XPath."""
+    _chapter_thread.block_xpath = etree.XPath(_BLOCK_XPATH_EXPR)
+
+def _extract_item_text(item) -> str:
+    """Internal helper: Text of one EPUB document item, one line per block element ('' if it has none)."""
+    try:
+        tree = lxml_html.fromstring(item.get_content())
+    except etree.ParserError: # Empty document
+        return ''
+    block_xpath = getattr(_chapter_thread, 'block_xpath', _BLOCK_XPATH)
+    text_blocks = []
+    for elem in block_xpath(tree):
+        block_text = ' '.join(filter(None, (s.strip() for s in elem.itertext())))
+        if block_text:
+            text_blocks.append(block_text)
+    return '\n'.join(text_blocks)
+
+def _epub_to_txt_one(epub_file: str, input_dir: str, output_dir: str, chapter_threads: int = 1) -> dict:
+    """
+    Internal helper (process pool worker): Converts one EPUB to a TXT file in output_dir.
+    chapter_threads > 1 extracts the chapters on that many threads (for batches with fewer EPUBs than workers).
+    Returns a result record: {"file", "ok", "messages", "detail", "error"}.
+    """
+    input_path = os.path.join(input_dir, epub_file)
+    output_filename = f"{os.path.splitext(epub_file)[0]}.txt"
+    output_path = os.path.join(output_dir, output_filename)
+
+    try:
+        book = epub.read_epub(input_path)
+        doc_items = [item for item in book.get_items() if item.get_type() == 9] # ebooklib.ITEM_DOCUMENT
+        chapter_threads = min(chapter_threads, len(doc_items))
+        if chapter_threads > 1:
+            with ThreadPoolExecutor(max_workers=chapter_threads, initializer=_init_chapter_thread) as executor:
+                chapter_texts = list(executor.map(_extract_item_text, doc_items))
+        else:
+            chapter_texts = map(_extract_item_text, doc_items)
+        full_text_content = '\n\n'.join(filter(None, chapter_texts))
+
+        # Encoded once and written as bytes: skips TextIOWrapper's codec and newline layers (output is always LF)
+        with open(output_path, 'wb') as fout:
+            fout.write(full_text_content.encode('utf-8'))
+
+        module_logger.info("Conversion successful: '%s' -> '%s'", epub_file, output_filename)
+        return {"file": epub_file, "ok": True, "messages": [], "detail": {"original": epub_file, "converted": output_filename}, "error": None}
+    except Exception as e:
+        error_msg = str(e).split('\n')[0]
+        msg = f"Conversion failed for '{epub_file}': {type(e).__name__} - {error_msg}"
+        module_logger.error(msg, exc_info=False)
+        return {"file": epub_file, "ok": False, "messages": [f"[ERROR] {msg}"], "detail": None, "error": msg}
+
+def epub_to_txt_api(input_dir: str, output_dir: str, max_workers: int = None, verbose: bool = False) -> dict:
     """
     API-adapted: EPUB to TXT conversion.
     Args:
         input_dir (str): The directory containing the EPUB files.
         output_dir (str): The directory where the converted TXT files will be saved.
+        max_workers (int, optional): Max worker processes. Defaults to min(CPU count, 8). With fewer EPUBs than
+            workers, the spare ones extract chapters on threads (up to 4 per EPUB).
+        verbose (bool): Also add a [SUCCESS] message per EPUB. Errors, warnings and the summary are always
+            reported; per-file results are in success_files/error_files either way.
     Returns:
         dict: Operation results.
     """
     module_logger.info(f"API: Starting EPUB to TXT conversion from '{input_dir}' to '{output_dir}'")
     messages = []
-    success_files_details = []
-    error_files_details = []
-    processed_count = 0
-    error_count = 0
-    overall_success = True
 
     if not os.path.isdir(input_dir):
         msg = f"Input directory '{input_dir}' does not exist."
@@ -31,8 +118,8 @@ def epub_to_txt_api(input_dir: str, output_dir: str) -> dict:
         return {"success": False, "messages": [f"[ERROR] {msg}"], "processed_count": 0, "error_count": 1, "success_files": [], "error_files": []}
 
     try:
-        epub_files = [f for f in os.listdir(input_dir) if f.lower().endswith('.epub')]
-    except Exception as e:
+        epub_files = _list_files_with_suffix(input_dir, '.epub')
+    except OSError as e:
         msg = f"Could not read input directory '{input_dir}': {e}"
         module_logger.error(msg)
         return {"success": False, "messages": [f"[ERROR] {msg}"], "processed_count": 0, "error_count": 1, "success_files": [], "error_files": []}
@@ -52,50 +139,26 @@ def epub_to_txt_api(input_dir: str, output_dir: str) -> dict:
 
     total_files = len(epub_files)
 
-    for epub_file in tqdm(epub_files, desc="API EPUB Conversion", unit="file", disable=True):
-        input_path = os.path.join(input_dir, epub_file)
-        output_filename = f"{os.path.splitext(epub_file)[0]}.txt"
-        output_path = os.path.join(output_dir, output_filename)
-        processed_count +=1
-
-        try:
-            book = epub.read_epub(input_path)
-            content_parts = []
-            for item in book.get_items():
-                if item.get_type() == 9: # ebooklib.ITEM_DOCUMENT
-                    soup = BeautifulSoup(item.get_content(), 'html.parser')
-                    text_blocks = []
-                    for elem in soup.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'div', 'li']):
-                        block_text = elem.get_text(separator=' ', strip=True)
-                        if block_text:
-                            text_blocks.append(block_text)
-                    if text_blocks:
-                        content_parts.append('\n'.join(text_blocks))
-
-            full_text_content = '\n\n'.join(content_parts)
-
-            with open(output_path, 'w', encoding='utf-8') as fout:
-                fout.write(full_text_content)
-
-            msg = f"Conversion successful: '{epub_file}' -> '{output_filename}'"
-            module_logger.info(msg)
-            messages.append(f"[SUCCESS] {msg}")
-            success_files_details.append({"original": epub_file, "converted": output_filename})
-        except Exception as e:
-            error_msg = str(e).split('\n')[0]
-            msg = f"Conversion failed for '{epub_file}': {type(e).__name__} - {error_msg}"
-            module_logger.error(msg, exc_info=False)
-            messages.append(f"[ERROR] {msg}")
-            error_files_details.append({"file": epub_file, "error": msg})
-            error_count += 1
-            overall_success = False
+    workers = max_workers or _DEFAULT_MAX_WORKERS
+    # Workers the batch can't fill go to chapter threads, so a lone large EPUB isn't extracted serially
+    chapter_threads = max(1, min(_MAX_CHAPTER_THREADS, workers // total_files))
+    jobs = [(epub_file, input_dir, output_dir, chapter_threads) for epub_file in epub_files]
+    results = run_jobs(_epub_to_txt_one, jobs, workers)
+    for record in results:
+        messages.extend(record["messages"])
+    success_files_details = [r["detail"] for r in results if r["ok"]]
+    # Success lines are built here rather than in the workers, so the per-file path only returns the detail dict
+    if verbose:
+        messages.extend(f"[SUCCESS] Conversion successful: '{d['original']}' -> '{d['converted']}'" for d in success_files_details)
+    error_files_details = [{"file": r["file"], "error": r["error"]} for r in results if not r["ok"]]
+    error_count = len(error_files_details)
     
     final_summary_msg = f"EPUB to TXT conversion finished. Total EPUBs: {total_files}, Succeeded: {len(success_files_details)}, Failed: {error_count}."
     module_logger.info(final_summary_msg)
     messages.append(f"[INFO] {final_summary_msg}")
 
     return {
-        "success": overall_success and error_count == 0,
+        "success": error_count == 0,
         "messages": messages,
         "total_processed": total_files,
         "success_count": len(success_files_details),
@@ -105,23 +168,69 @@ def epub_to_txt_api(input_dir: str, output_dir: str) -> dict:
     }
 
 
-def pdf_to_txt_api(input_dir: str, output_dir: str, output_format: str = 'standard') -> dict:
+def _pdf_to_txt_one(pdf_file: str, input_dir: str, output_dir: str, output_format: str) -> dict:
+    """
+    Internal helper (process pool worker): Extracts the text of one PDF to a TXT file in output_dir.
+    Returns a result record: {"file", "ok", "messages", "detail", "error"}.
+    """
+    input_path = os.path.join(input_dir, pdf_file)
+    output_filename = f"{os.path.splitext(pdf_file)[0]}.txt"
+    output_path = os.path.join(output_dir, output_filename)
+    streamed_output = False # True once this call has opened (and truncated) output_path
+    try:
+        with fitz.open(input_path) as doc:
+            if output_format == 'standard':
+                # No post-processing: stream each page straight to the file instead of building the whole text
+                with open(output_path, 'wb') as f:
+                    streamed_output = True
+                    f.writelines(page.get_text("text").encode('utf-8') for page in doc)
+            else:
+                # The regexes below work across page boundaries, so they need the whole text
+                text_content = "".join(page.get_text("text") for page in doc)
+        
+        if output_format == 'compact':
+            text_content = _RE_NL3.sub('\n\n', text_content)
+            text_content = _RE_NL2.sub('\n', text_content)
+        elif output_format == 'clean':
+            if text_content.isascii():
+                text_content = text_content.translate(_CLEAN_ASCII_TABLE)
+            else: # translate's fast path only covers ASCII; mixed CJK text is quicker through the regex
+                text_content = _RE_CLEAN_CHARS.sub('', text_content)
+            text_content = _RE_SPACES.sub(' ', text_content)
+            text_content = _RE_NL3.sub('\n\n', text_content)
+            text_content = text_content.strip()
+
+        if output_format != 'standard':
+            with open(output_path, 'wb') as f:
+                f.write(text_content.encode('utf-8'))
+
+        module_logger.info("Conversion successful: '%s' -> '%s'", pdf_file, output_filename)
+        return {"file": pdf_file, "ok": True, "messages": [], "detail": {"original": pdf_file, "converted": output_filename}, "error": None}
+    except Exception as e:
+        error_msg = str(e).split('\n')[0]
+        msg = f"Conversion failed for '{pdf_file}': {type(e).__name__} - {error_msg}"
+        module_logger.error(msg, exc_info=False)
+        if streamed_output: # Clean up the partially streamed file; never touch one this call didn't write
+            try: os.remove(output_path)
+            except OSError: pass
+        return {"file": pdf_file, "ok": False, "messages": [f"[ERROR] {msg}"], "detail": None, "error": msg}
+
+def pdf_to_txt_api(input_dir: str, output_dir: str, output_format: str = 'standard', max_workers: int = None,
+                   verbose: bool = False) -> dict:
     """
     API-adapted: PDF to TXT conversion.
     Args:
         input_dir (str): The directory containing the PDF files.
         output_dir (str): The directory where the converted TXT files will be saved.
         output_format (str): Text format ['standard'|'compact'|'clean']
+        max_workers (int, optional): Max worker processes. Defaults to min(CPU count, 8).
+        verbose (bool): Also add a [SUCCESS] message per PDF. Errors, warnings and the summary are always
+            reported; per-file results are in success_files/error_files either way.
     Returns:
         dict: Operation results.
     """
     module_logger.info(f"API: Starting PDF to TXT conversion (format: {output_format}) from '{input_dir}' to '{output_dir}'")
     messages = []
-    success_files_details = []
-    error_files_details = []
-    processed_count = 0
-    error_count = 0
-    overall_success = True
 
     valid_formats = ['standard', 'compact', 'clean']
     if output_format not in valid_formats:
@@ -135,8 +244,8 @@ def pdf_to_txt_api(input_dir: str, output_dir: str, output_format: str = 'standa
         return {"success": False, "messages": [f"[ERROR] {msg}"], "processed_count": 0, "error_count": 1, "success_files": [], "error_files": []}
 
     try:
-        pdf_files = [f for f in os.listdir(input_dir) if f.lower().endswith('.pdf')]
-    except Exception as e:
+        pdf_files = _list_files_with_suffix(input_dir, '.pdf')
+    except OSError as e:
         msg = f"Could not read input directory '{input_dir}': {e}"
         module_logger.error(msg)
         return {"success": False, "messages": [f"[ERROR] {msg}"], "processed_count": 0, "error_count": 1, "success_files": [], "error_files": []}
@@ -156,50 +265,22 @@ def pdf_to_txt_api(input_dir: str, output_dir: str, output_format: str = 'standa
 
     total_files = len(pdf_files)
 
-    for pdf_file in tqdm(pdf_files, desc="API PDF Conversion", unit="file", disable=True):
-        input_path = os.path.join(input_dir, pdf_file)
-        output_filename = f"{os.path.splitext(pdf_file)[0]}.txt"
-        output_path = os.path.join(output_dir, output_filename)
-        processed_count += 1
-        text_content = ""
-
-        try:
-            with fitz.open(input_path) as doc:
-                for page_num in range(len(doc)):
-                    page = doc.load_page(page_num)
-                    text_content += page.get_text("text")
-            
-            if output_format == 'compact':
-                text_content = re.sub(r'\n{3,}', '\n\n', text_content) 
-                text_content = re.sub(r'\n{2,}', '\n', text_content) 
-            elif output_format == 'clean':
-                text_content = re.sub(r'[^\u4e00-\u9fa5a-zA-Z0-9\s\n。，！？、；：“”‘’（）《》〈〉【】「」『』．﹒ :,.!?;\']', '', text_content)
-                text_content = re.sub(r'[ \t]{2,}', ' ', text_content)
-                text_content = re.sub(r'\n{3,}', '\n\n', text_content)
-                text_content = text_content.strip()
-
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(text_content)
-
-            msg = f"Conversion successful: '{pdf_file}' -> '{output_filename}'"
-            module_logger.info(msg)
-            messages.append(f"[SUCCESS] {msg}")
-            success_files_details.append({"original": pdf_file, "converted": output_filename})
-        except Exception as e:
-            error_msg = str(e).split('\n')[0]
-            msg = f"Conversion failed for '{pdf_file}': {type(e).__name__} - {error_msg}"
-            module_logger.error(msg, exc_info=False)
-            messages.append(f"[ERROR] {msg}")
-            error_files_details.append({"file": pdf_file, "error": msg})
-            error_count += 1
-            overall_success = False
+    jobs = [(pdf_file, input_dir, output_dir, output_format) for pdf_file in pdf_files]
+    results = run_jobs(_pdf_to_txt_one, jobs, max_workers or _DEFAULT_MAX_WORKERS)
+    for record in results:
+        messages.extend(record["messages"])
+    success_files_details = [r["detail"] for r in results if r["ok"]]
+    if verbose:
+        messages.extend(f"[SUCCESS] Conversion successful: '{d['original']}' -> '{d['converted']}'" for d in success_files_details)
+    error_files_details = [{"file": r["file"], "error": r["error"]} for r in results if not r["ok"]]
+    error_count = len(error_files_details)
 
     final_summary_msg = f"PDF to TXT conversion (format: {output_format}) finished. Total PDFs: {total_files}, Succeeded: {len(success_files_details)}, Failed: {error_count}."
     module_logger.info(final_summary_msg)
     messages.append(f"[INFO] {final_summary_msg}")
     
     return {
-        "success": overall_success and error_count == 0,
+        "success": error_count == 0,
         "messages": messages,
         "total_processed": total_files,
         "success_count": len(success_files_details),
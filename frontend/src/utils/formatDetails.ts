@@ -23,6 +23,25 @@ export function formatDetails(details: any): string {
       out += `  - ${item.file}，原因：${item.reason}\n`;
     });
   }
+  if (details.success_files && details.success_files.length) {
+    out += '\n成功文件明细：\n';
+    details.success_files.forEach((item: any) => {
+      const target = item.converted ?? item.encrypted ?? item.processed ?? item.repaired ?? item.status;
+      out += target ? `  - ${item.original ?? item.file} → ${target}\n` : `  - ${item.original ?? item.file}\n`;
+    });
+  }
+  if (details.successful_isos && details.successful_isos.length) {
+    out += '\n成功镜像明细：\n';
+    details.successful_isos.forEach((item: any) => {
+      out += `  - ${item.source_folder} → ${item.iso_name}\n`;
+    });
+  }
+  if (details.skipped_isos && details.skipped_isos.length) {
+    out += '\n跳过镜像明细：\n';
+    details.skipped_isos.forEach((item: any) => {
+      out += `  - ${item.source_folder}，原因：${item.reason}\n`;
+    });
+  }
   if (details.error_details && details.error_details.length) {
     out += '\n错误明细：\n';
     details.error_details.forEach((item: any) => {